@@ -2,14 +2,22 @@ from __future__ import annotations
 from random import randint
 from typing import TYPE_CHECKING
 from exception import Impossible
+from scheduler import ACTION_COST
+from events import Pickup, events
 import color
 
+# How far, in tiles, a fight can be heard
+COMBAT_NOISE = 12
+
 if TYPE_CHECKING:
     from engine import Engine
     from entity import Entity, Actor, Item
 
 
 class Action:
+    # Energy spent performing this action, see `scheduler`
+    cost = ACTION_COST
+
     def __init__(self, entity: Actor) -> None:
         self.entity = entity
 
@@ -64,22 +72,22 @@ class MeleeAction(ActionWithDirection):
             0, self.entity.fighter.power * (1 + critical_hit) - target.fighter.defense
         )
 
-        attack_description = f"{self.entity.name.capitalize()} attacks {target.name}"
-        if critical_hit:
-            attack_description += " giving a CRITICAL strike"
-        if damage > 0:
-            attack_description += f" for {damage} hit points."
-        else:
-            attack_description += " but does no damage."
-
+        template = "attack" + ".critical" * critical_hit + ".no_damage" * (damage <= 0)
         attack_color = (
             color.player_attack
             if self.entity is self.engine.player
             else color.enemy_attack
         )
 
-        self.engine.message_log.add_message(attack_description, attack_color)
-        target.fighter.hp -= damage
+        self.engine.message_log.add(
+            template,
+            attack_color,
+            attacker=self.entity.name,
+            target=target.name,
+            damage=damage,
+        )
+        self.engine.game_map.activation.make_noise(self.position, COMBAT_NOISE)
+        target.fighter.take_damage(damage, self.entity.name)
 
 
 class MovementAction(ActionWithDirection):
@@ -98,11 +106,15 @@ class MovementAction(ActionWithDirection):
 
 
 class BumpAction(ActionWithDirection):
-    def perform(self) -> None:
+    def resolve(self) -> ActionWithDirection:
+        """Return the action this bump turns into, an attack or a move"""
         if self.target_actor:
-            return MeleeAction(self.entity, self.dx, self.dy).perform()
+            return MeleeAction(self.entity, self.dx, self.dy)
         else:
-            return MovementAction(self.entity, self.dx, self.dy).perform()
+            return MovementAction(self.entity, self.dx, self.dy)
+
+    def perform(self) -> None:
+        return self.resolve().perform()
 
 
 class ItemAction(Action):
@@ -138,10 +150,11 @@ class PickupAction(Action):
                 if len(inventory.items) >= inventory.capacity:
                     raise Impossible("Your inventory is full.")
 
-                self.engine.game_map.entities.remove(item)
+                self.engine.game_map.remove_entity(item)
                 item.parent = self.entity.inventory
                 inventory.items.append(item)
-                self.engine.message_log.add_message(f"You picked up the {item.name}")
+                events.publish(Pickup, self.entity, item)
+                self.engine.message_log.add("pickup", item=item.name)
                 return
 
         raise Impossible("There is nothing to pick up here.")
@@ -0,0 +1,125 @@
+"""
+Level of detail for actors far from the player
+
+Actors close to the player run their full AI every turn (ACTIVE), actors
+further away run a cheap coarse behavior once every few turns (COARSE), and
+actors out of that range are taken off the turn timeline entirely (DORMANT).
+Dormant actors are kept in a spatial bucket grid, so waking the ones near the
+player, or near a loud noise, only touches the buckets around it. Woken
+actors catch up statistically on the turns they slept through.
+"""
+
+from __future__ import annotations
+from enum import Enum, auto
+from typing import TYPE_CHECKING
+from scheduler import ACTION_COST
+
+if TYPE_CHECKING:
+    from entity import Actor
+    from game_map import GameMap
+
+ACTIVE_RADIUS = 20
+COARSE_RADIUS = 32
+# Coarse actors act once every this many turns
+COARSE_INTERVAL = 4
+# Actors woken by a noise stay awake at least this many turns
+ALERT_TURNS = 20
+BUCKET_SIZE = 16
+
+
+class Tier(Enum):
+    ACTIVE = auto()
+    COARSE = auto()
+    DORMANT = auto()
+
+
+def chebyshev(a: tuple[int, int], b: tuple[int, int]) -> int:
+    return max(abs(a[0] - b[0]), abs(a[1] - b[1]))
+
+
+class ActivationManager:
+    """Tracks the dormant actors of a map and decides the tier of the others"""
+
+    def __init__(self, game_map: GameMap) -> None:
+        self.game_map = game_map
+        # bucket -> {actor: scheduler time it fell asleep}
+        self.buckets: dict[tuple[int, int], dict[Actor, int]] = {}
+        self.sleeping: dict[Actor, tuple[int, int]] = {}
+        # actor -> scheduler time until which it cannot fall asleep
+        self.alerted: dict[Actor, int] = {}
+
+    def __contains__(self, actor: Actor) -> bool:
+        return actor in self.sleeping
+
+    @staticmethod
+    def bucket_of(position: tuple[int, int]) -> tuple[int, int]:
+        return position[0] // BUCKET_SIZE, position[1] // BUCKET_SIZE
+
+    def tier_of(self, actor: Actor, center: tuple[int, int]) -> Tier:
+        """Return the tier of `actor` given the player is at `center`"""
+        distance = chebyshev(actor.position, center)
+        if distance <= ACTIVE_RADIUS:
+            return Tier.ACTIVE
+        if distance <= COARSE_RADIUS:
+            return Tier.COARSE
+        if actor in self.alerted:
+            if self.alerted[actor] > self.game_map.scheduler.time:
+                return Tier.COARSE
+            del self.alerted[actor]
+        return Tier.DORMANT
+
+    def sleep(self, actor: Actor) -> None:
+        """Take `actor` off the timeline until something wakes it up"""
+        scheduler = self.game_map.scheduler
+        scheduler.remove(actor)
+        bucket = self.bucket_of(actor.position)
+        self.buckets.setdefault(bucket, {})[actor] = scheduler.time
+        self.sleeping[actor] = bucket
+
+    def forget(self, actor: Actor) -> None:
+        """Drop `actor` if dormant, e.g. when it dies or leaves the map"""
+        self.alerted.pop(actor, None)
+        bucket = self.sleeping.pop(actor, None)
+        if bucket is not None:
+            del self.buckets[bucket][actor]
+            if not self.buckets[bucket]:
+                del self.buckets[bucket]
+
+    def wake(self, actor: Actor) -> None:
+        """Put a dormant actor back on the timeline, after catching up"""
+        scheduler = self.game_map.scheduler
+        slept_at = self.buckets[self.sleeping[actor]][actor]
+        self.forget(actor)
+        turns = (scheduler.time - slept_at) // ACTION_COST
+        if turns > 0 and actor.ai:
+            actor.ai.catch_up(turns)
+        scheduler.add(actor)
+
+    def wake_near(self, position: tuple[int, int], radius: int) -> list[Actor]:
+        """Wake every dormant actor within `radius` and return them"""
+        if not self.sleeping:
+            return []
+        x1, y1 = self.bucket_of((position[0] - radius, position[1] - radius))
+        x2, y2 = self.bucket_of((position[0] + radius, position[1] + radius))
+
+        woken = [
+            actor
+            for bx in range(x1, x2 + 1)
+            for by in range(y1, y2 + 1)
+            for actor in self.buckets.get((bx, by), ())
+            if chebyshev(actor.position, position) <= radius
+        ]
+        for actor in woken:
+            self.wake(actor)
+        return woken
+
+    def make_noise(self, position: tuple[int, int], radius: int) -> None:
+        """
+        A loud event wakes up the dormant actors which can hear it
+        They stay awake for a while, to go and find out what happened
+        """
+        alert_until = self.game_map.scheduler.time + ALERT_TURNS * ACTION_COST
+        for actor in self.wake_near(position, radius):
+            self.alerted[actor] = alert_until
+            if actor.ai:
+                actor.ai.hear(position)
@@ -0,0 +1,117 @@
+"""
+Play many headless games in parallel, for balance sweeps
+
+Every seed is a separate task of a `multiprocessing` pool. Workers return a
+small dictionary per game and drop the engine, and are replaced after
+`maxtasksperchild` games so their memory cannot grow across a long sweep.
+Results are written as JSON lines while the games finish, followed by an
+aggregated summary.
+"""
+
+from __future__ import annotations
+from collections import Counter
+from multiprocessing import Pool
+from statistics import mean, median
+from time import perf_counter
+from typing import Iterable, Iterator, TextIO
+import argparse
+import json
+import os
+from headless import POLICIES, run_game
+from content import registry
+
+# Games played by a worker process before it is replaced
+TASKS_PER_CHILD = 50
+
+
+def play(task: tuple[int, str, int, int | None]) -> dict:
+    """Play the game of one seed and return its result"""
+    seed, policy, max_turns, max_floors = task
+    result = run_game(POLICIES[policy], max_turns, max_floors, seed)
+    record = {"seed": seed, "policy": policy}
+    record.update(result.as_dict())
+    return record
+
+
+def run_batch(
+    seeds: Iterable[int],
+    policy: str = "diver",
+    max_turns: int = 1000,
+    max_floors: int | None = None,
+    processes: int | None = None,
+) -> Iterator[dict]:
+    """Yield the result of every seed, in completion order"""
+    tasks = [(seed, policy, max_turns, max_floors) for seed in seeds]
+    if processes == 1:
+        yield from map(play, tasks)
+        return
+
+    processes = processes or os.cpu_count() or 1
+    # Content is compiled once here, forked workers inherit the tables and
+    # spawned ones read them from the cache
+    registry.load()
+    # Small chunks keep the workers busy when game lengths differ a lot
+    chunksize = max(1, len(tasks) // (processes * 8))
+    with Pool(processes, maxtasksperchild=TASKS_PER_CHILD) as pool:
+        yield from pool.imap_unordered(play, tasks, chunksize)
+
+
+def summarize(records: list[dict]) -> dict:
+    """Aggregate the per-game results of a batch"""
+    if not records:
+        return {"games": 0}
+    floors = [record["floor"] for record in records]
+    deaths = Counter(
+        record["cause_of_death"] or "unknown"
+        for record in records
+        if not record["alive"]
+    )
+    return {
+        "games": len(records),
+        "survived": sum(record["alive"] for record in records),
+        "floor_mean": mean(floors),
+        "floor_median": median(floors),
+        "floor_max": max(floors),
+        "floors": dict(sorted(Counter(floors).items())),
+        "turns_mean": mean(record["turns"] for record in records),
+        "xp_mean": mean(record["xp"] for record in records),
+        "level_mean": mean(record["level"] for record in records),
+        "causes_of_death": dict(deaths.most_common()),
+    }
+
+
+def stream_batch(records: Iterable[dict], file: TextIO) -> dict:
+    """Write each record as a JSON line as it arrives, and return the summary"""
+    collected = []
+    for record in records:
+        file.write(json.dumps(record) + "\n")
+        file.flush()
+        collected.append(record)
+    return summarize(collected)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Play many headless games.")
+    parser.add_argument("-o", "--output", required=True, help="JSON lines file")
+    parser.add_argument("--games", type=int, default=100, help="amount of games")
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--policy", choices=POLICIES, default="diver")
+    parser.add_argument("--turns", type=int, default=1000, help="turn limit")
+    parser.add_argument("--floors", type=int, help="stop when reaching this floor")
+    parser.add_argument("-j", "--processes", type=int, help="worker processes")
+    args = parser.parse_args()
+
+    seeds = range(args.first_seed, args.first_seed + args.games)
+    start = perf_counter()
+    with open(args.output, "w") as file:
+        summary = stream_batch(
+            run_batch(seeds, args.policy, args.turns, args.floors, args.processes),
+            file,
+        )
+        summary["elapsed"] = perf_counter() - start
+        file.write(json.dumps({"summary": summary}) + "\n")
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark baselines and regression gate
+
+`python -m benchmarks.compare save baseline.json` runs the suite and stores it
+`python -m benchmarks.compare check baseline.json` reruns the suite and exits
+with a non-zero status when a hot path got slower than the allowed threshold
+"""
+
+from __future__ import annotations
+from benchmarks.suite import BENCHMARKS, argument_parser, run_report
+import argparse
+import json
+import sys
+
+# Relative slowdown of the median tolerated before failing
+THRESHOLD = 0.10
+# A slowdown must also be larger than this many IQRs to not be noise
+NOISE_FACTOR = 1.5
+
+
+class Comparison:
+    """The difference of a single metric between baseline and current run"""
+
+    def __init__(self, key: str, baseline: dict | None, current: dict | None) -> None:
+        self.key = key
+        self.baseline = baseline
+        self.current = current
+
+    @property
+    def change(self) -> float:
+        """Relative change of the median, positive means slower"""
+        if not self.baseline or not self.current:
+            return 0.0
+        return self.current["median"] / self.baseline["median"] - 1
+
+    @property
+    def noise(self) -> float:
+        """Largest spread between both runs, in seconds"""
+        if not self.baseline or not self.current:
+            return 0.0
+        return NOISE_FACTOR * max(self.baseline["iqr"], self.current["iqr"])
+
+    def status(self, threshold: float = THRESHOLD) -> str:
+        if self.baseline is None:
+            return "new"
+        if self.current is None:
+            return "missing"
+
+        delta = self.current["median"] - self.baseline["median"]
+        if abs(delta) <= self.noise or abs(self.change) <= threshold:
+            return "ok"
+        return "REGRESSED" if delta > 0 else "improved"
+
+
+def compare(baseline: dict, current: dict, names: list[str]) -> list[Comparison]:
+    """Match the results of two reports by their metric key"""
+    old = {record["key"]: record for record in baseline["results"]}
+    new = {record["key"]: record for record in current["results"]}
+    keys = list(new) + [
+        key
+        for key in old
+        if key not in new and (not names or old[key]["name"] in names)
+    ]
+    return [Comparison(key, old.get(key), new.get(key)) for key in keys]
+
+
+def format_table(comparisons: list[Comparison], threshold: float = THRESHOLD) -> str:
+    """Return the comparisons as a human readable table"""
+
+    def milliseconds(record: dict | None) -> str:
+        if record is None:
+            return "-"
+        return f"{record['median'] * 1000:.3f} ± {record['iqr'] * 1000:.3f}"
+
+    rows = [("benchmark", "baseline (ms)", "current (ms)", "change", "status")]
+    for comparison in comparisons:
+        rows.append(
+            (
+                comparison.key,
+                milliseconds(comparison.baseline),
+                milliseconds(comparison.current),
+                f"{comparison.change:+.1%}",
+                comparison.status(threshold),
+            )
+        )
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    lines = [
+        "  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip()
+        for row in rows
+    ]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def main() -> None:
+    command = argparse.ArgumentParser(add_help=False)
+    command.add_argument("command", choices=["save", "check"])
+    command.add_argument("baseline", help="baseline JSON file")
+    parser = argument_parser(
+        "Store or check a benchmark baseline.", repeat=7, parents=[command]
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=THRESHOLD,
+        help="relative slowdown allowed before failing",
+    )
+    args = parser.parse_args()
+    if unknown := set(args.names) - set(BENCHMARKS):
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    if args.command == "check":
+        # Fail early rather than after running the whole suite
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    report = run_report(args.names, args.repeat, args.min_time)
+
+    if args.command == "save":
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    comparisons = compare(baseline, report, args.names)
+    print(format_table(comparisons, args.threshold))
+
+    regressions = [c for c in comparisons if c.status(args.threshold) == "REGRESSED"]
+    if regressions:
+        print(
+            f"\n{len(regressions)} benchmark(s) regressed beyond {args.threshold:.0%}"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Scaling stress scenarios for the turn loop
+
+Arena maps are built directly, without `generate_dungeon`, and filled with
+hostile actors. Each subsystem of a turn is timed per map size and enemy
+count, producing curves which show where the cost grows superlinearly.
+
+Run with `python -m benchmarks.scenarios`
+"""
+
+from __future__ import annotations
+from copy import deepcopy
+from math import log
+from statistics import median
+from time import perf_counter
+from tcod.console import Console
+from engine import Engine
+from game_map import GameMap
+import argparse
+import json
+import random
+import sys
+import numpy as np
+import entity_factory
+import tile_types
+
+SEED = 1234
+MAP_SIZES = [64, 128, 256, 512, 1000]
+ENEMY_COUNTS = [10, 100, 1000, 10000]
+SUBSYSTEMS = ["handle_enemy_turn", "update_fov", "render"]
+
+# A slope over this value on a log-log curve is reported as superlinear
+SUPERLINEAR_SLOPE = 1.2
+
+
+def build_arena(
+    size: int, enemies: int, pillar_density: float = 0.05, seed: int = SEED
+) -> Engine:
+    """
+    Return an engine holding a square arena of `size` tiles
+
+    The arena is an open floor surrounded by walls, scattered with pillars to
+    give FOV and pathfinding something to work with. The player stands at
+    the center and `enemies` orcs are spread across the free tiles.
+    """
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+
+    player = deepcopy(entity_factory.player)
+    player.fighter.max_hp = player.fighter.hp = 10**9
+    engine = Engine(player)
+
+    game_map = GameMap(engine, (size, size), entities=[])
+    game_map.tiles[1:-1, 1:-1] = tile_types.floor
+    pillars = rng.random((size, size)) < pillar_density
+    pillars[0, :] = pillars[-1, :] = pillars[:, 0] = pillars[:, -1] = False
+    game_map.tiles[pillars] = tile_types.wall
+    engine.game_map = game_map
+
+    center = size // 2, size // 2
+    game_map.tiles[center] = tile_types.floor
+    player.place(center, game_map)
+
+    free = np.argwhere(game_map.tiles["walkable"])
+    free = free[(free[:, 0] != center[0]) | (free[:, 1] != center[1])]
+    chosen = rng.choice(len(free), size=min(enemies, len(free)), replace=False)
+    for x, y in free[chosen].tolist():
+        entity_factory.orc.spawn(game_map, (x, y))
+
+    engine.update_fov()
+    return engine
+
+
+def time_turns(engine: Engine, turns: int) -> dict[str, float]:
+    """Play `turns` enemy turns and return the median time of each subsystem"""
+    console = Console(96, 64, order="F")
+    timings: dict[str, list[float]] = {name: [] for name in SUBSYSTEMS}
+
+    for _ in range(turns):
+        start = perf_counter()
+        engine.handle_enemy_turn()
+        timings["handle_enemy_turn"].append(perf_counter() - start)
+
+        start = perf_counter()
+        engine.update_fov()
+        timings["update_fov"].append(perf_counter() - start)
+
+        start = perf_counter()
+        engine.render_map(console)
+        timings["render"].append(perf_counter() - start)
+
+    return {name: median(samples) for name, samples in timings.items()}
+
+
+def slope(start: tuple[int, float], end: tuple[int, float]) -> float:
+    """Return the log-log slope between two points of a curve"""
+    (n1, t1), (n2, t2) = start, end
+    if n1 == n2 or t1 <= 0 or t2 <= 0:
+        return 0.0
+    return log(t2 / t1) / log(n2 / n1)
+
+
+def build_curves(points: list[dict]) -> dict:
+    """
+    Group the measured points into curves per subsystem
+
+    `by_enemies` holds one curve per map size, over the enemy count
+    `by_map_size` holds one curve per enemy count, over the tile count
+    """
+    curves: dict = {}
+    for subsystem in SUBSYSTEMS:
+        by_enemies: dict[int, list[tuple[int, float]]] = {}
+        by_map_size: dict[int, list[tuple[int, float]]] = {}
+        for point in points:
+            seconds = point["timings"][subsystem]
+            by_enemies.setdefault(point["map_size"], []).append(
+                (point["enemies"], seconds)
+            )
+            by_map_size.setdefault(point["enemies"], []).append(
+                (point["map_size"] ** 2, seconds)
+            )
+        curves[subsystem] = {
+            "by_enemies": {str(k): v for k, v in by_enemies.items()},
+            "by_map_size": {str(k): v for k, v in by_map_size.items()},
+        }
+    return curves
+
+
+def find_superlinear(curves: dict) -> list[dict]:
+    """List every curve segment whose log-log slope exceeds `SUPERLINEAR_SLOPE`"""
+    found = []
+    for subsystem, axes in curves.items():
+        for axis, series in axes.items():
+            for fixed, points in series.items():
+                for start, end in zip(points, points[1:]):
+                    if slope(start, end) > SUPERLINEAR_SLOPE:
+                        found.append(
+                            {
+                                "subsystem": subsystem,
+                                "axis": axis,
+                                "fixed": int(fixed),
+                                "from": start[0],
+                                "to": end[0],
+                                "slope": slope(start, end),
+                            }
+                        )
+    return found
+
+
+def run_scenarios(
+    map_sizes: list[int], enemy_counts: list[int], turns: int = 5
+) -> dict:
+    """Measure every map size and enemy count combination"""
+    points = []
+    for size in map_sizes:
+        for enemies in enemy_counts:
+            # Keep at least half of the arena free to move around
+            if enemies > (size - 2) ** 2 // 2:
+                continue
+            engine = build_arena(size, enemies)
+            timings = time_turns(engine, turns)
+            print(
+                f"{size:>5}x{size:<5} {enemies:>6} enemies  "
+                + "  ".join(f"{k} {v * 1000:9.3f} ms" for k, v in timings.items()),
+                file=sys.stderr,
+            )
+            points.append({"map_size": size, "enemies": enemies, "timings": timings})
+
+    curves = build_curves(points)
+    return {
+        "meta": {"seed": SEED, "turns": turns, "unit": "s"},
+        "points": points,
+        "curves": curves,
+        "superlinear": find_superlinear(curves),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the scaling scenarios.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=MAP_SIZES)
+    parser.add_argument("--enemies", type=int, nargs="+", default=ENEMY_COUNTS)
+    parser.add_argument("--turns", type=int, default=5, help="turns per scenario")
+    parser.add_argument("-o", "--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = run_scenarios(sorted(args.sizes), sorted(args.enemies), args.turns)
+    for segment in report["superlinear"]:
+        print(
+            f"superlinear: {segment['subsystem']} {segment['axis']}"
+            f" (fixed {segment['fixed']}) {segment['from']} -> {segment['to']}"
+            f" slope {segment['slope']:.2f}",
+            file=sys.stderr,
+        )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
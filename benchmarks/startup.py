@@ -0,0 +1,101 @@
+"""
+Cold start measurements
+
+Every run happens in a fresh interpreter, so nothing is already imported.
+`first_frame` times the game from nothing to its main menu drawn on a console,
+and `import_times` breaks the imports of a module down with `-X importtime`.
+
+Run with `python -m benchmarks.startup`
+"""
+
+from __future__ import annotations
+from statistics import median
+from time import perf_counter
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def first_frame() -> float:
+    """Import the game, load its tileset and draw the main menu, in seconds"""
+    start = perf_counter()
+    import project
+    import tcod
+
+    tileset = tcod.tileset.load_tilesheet(
+        os.path.join(ROOT, "assets", "tileset.png"), 16, 16, tcod.tileset.CHARMAP_CP437
+    )
+    console = tcod.console.Console(*project.screen_size, order="F")
+    project.MainMenu().on_render(console)
+    assert tileset.tile_shape == (16, 16)
+    return perf_counter() - start
+
+
+def run_child(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-W", "ignore", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def time_first_frame(runs: int = 5) -> list[float]:
+    """Time to first frame of `runs` fresh interpreters"""
+    return [
+        float(run_child("-m", "benchmarks.startup", "--child").stdout)
+        for _ in range(runs)
+    ]
+
+
+def import_times(module: str = "project") -> list[tuple[str, int, int]]:
+    """
+    Return the (module, self, cumulative) import times of `module` and of
+    everything it imports, in microseconds, in import order
+    """
+    stderr = run_child("-X", "importtime", "-c", f"import {module}").stderr
+    times = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line.removeprefix("import time:").split("|")
+        times.append((name.strip(), int(own), int(cumulative)))
+    return times
+
+
+def is_local(name: str) -> bool:
+    """Whether `name` is a module of this repository"""
+    path = os.path.join(ROOT, *name.split("."))
+    return os.path.exists(path + ".py") or os.path.isdir(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the game cold start.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters")
+    parser.add_argument("--top", type=int, default=15, help="imports listed")
+    parser.add_argument("--module", default="project", help="module to import")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(first_frame())
+        return
+
+    samples = time_first_frame(args.runs)
+    print(f"first frame: {median(samples) * 1000:.1f} ms (median of {args.runs})")
+    times = import_times(args.module)
+    total = max(cumulative for _, _, cumulative in times)
+    print(f"import {args.module}: {total / 1000:.1f} ms")
+    print(f"{'module':<32} {'self ms':>8} {'total ms':>9}")
+    local = [entry for entry in times if is_local(entry[0])]
+    for name, own, cumulative in sorted(local, key=lambda t: -t[2])[: args.top]:
+        print(f"{name:<32} {own / 1000:8.1f} {cumulative / 1000:9.1f}")
+    others = sum(own for name, own, _ in times if not is_local(name))
+    print(f"{'(third party and stdlib)':<32} {others / 1000:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
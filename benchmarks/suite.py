@@ -0,0 +1,266 @@
+"""
+Micro-benchmarks for the engine hot paths
+
+Run with `python -m benchmarks.suite`, results are written as JSON
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING, Callable, Iterator, Sequence
+from copy import deepcopy
+from statistics import median, quantiles
+from time import perf_counter
+from tcod.console import Console
+from engine import Engine
+from game_map import GameMap, GameWorld
+from generation.dungeon import generate_dungeon
+from generation.rooms import RectangularRoom
+from generation.spawn import populate_room
+from project import load_game
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import numpy as np
+import entity_factory
+
+if TYPE_CHECKING:
+    from entity import Actor
+
+SEED = 1234
+MAP_SIZES = [(64, 64), (128, 128), (256, 256)]
+ENTITY_COUNTS = [10, 100, 500]
+MESSAGE_COUNTS = [100, 1000, 10000]
+
+Timed = Callable[[], object]
+
+
+def build_engine(map_size: tuple[int, int], seed: int = SEED) -> Engine:
+    """Build an engine with a freshly generated floor of the given size"""
+    random.seed(seed)
+    player = deepcopy(entity_factory.player)
+    player.fighter.max_hp = player.fighter.hp = 10**9
+    engine = Engine(player)
+    engine.game_world = GameWorld(max(30, map_size[0] // 2), (8, 12), map_size, engine)
+    engine.game_world.generate_floor()
+    engine.update_fov()
+    return engine
+
+
+def spawn_enemies(engine: Engine, count: int) -> list[Actor]:
+    """Spawn `count` orcs over random free floor tiles"""
+    game_map = engine.game_map
+    occupied = {entity.position for entity in game_map.entities}
+    floor = [
+        (int(x), int(y))
+        for x, y in zip(*np.nonzero(game_map.tiles["walkable"]))
+        if (x, y) not in occupied
+    ]
+    return [
+        entity_factory.orc.spawn(game_map, position)
+        for position in random.sample(floor, min(count, len(floor)))
+    ]
+
+
+def bench_generate_dungeon(map_size: tuple[int, int]) -> Timed:
+    engine = build_engine(map_size)
+    game_world = engine.game_world
+    return lambda: generate_dungeon(
+        game_world.max_rooms, game_world.room_limits, map_size, engine
+    )
+
+
+def bench_populate_room(floor: int) -> Timed:
+    engine = build_engine((64, 64))
+    room = RectangularRoom(10, 10, 12, 12)
+
+    def run() -> None:
+        dungeon = GameMap(engine, (64, 64), entities=[])
+        populate_room(dungeon, room, floor)
+
+    return run
+
+
+def bench_update_fov(map_size: tuple[int, int]) -> Timed:
+    return build_engine(map_size).update_fov
+
+
+def bench_handle_enemy_turn(enemies: int) -> Timed:
+    engine = build_engine((128, 128))
+    spawn_enemies(engine, enemies)
+    return engine.handle_enemy_turn
+
+
+def bench_get_path_to(map_size: tuple[int, int]) -> Timed:
+    engine = build_engine(map_size)
+    (enemy,) = spawn_enemies(engine, 1)
+    destination = engine.game_map.down_stairs_location
+    return lambda: enemy.ai.get_path_to(destination)
+
+
+def bench_game_map_render(map_size: tuple[int, int]) -> Timed:
+    engine = build_engine(map_size)
+    spawn_enemies(engine, 100)
+    engine.game_map.explored[:] = True
+    console = Console(96, 64, order="F")
+    return lambda: engine.render_map(console)
+
+
+def bench_render_messages(messages: int) -> Timed:
+    engine = build_engine((64, 64))
+    for i in range(messages):
+        engine.message_log.add_message(f"Message {i}, long enough to wrap twice.")
+    console = Console(96, 64, order="F")
+    log = engine.message_log
+    return lambda: log.render_messages(console, (64, 40), (32, 24), log.messages)
+
+
+def bench_save_and_load(map_size: tuple[int, int]) -> Timed:
+    engine = build_engine(map_size)
+    spawn_enemies(engine, 100)
+    # Removed along with the save file once `run` is dropped
+    directory = tempfile.TemporaryDirectory()
+
+    def run() -> None:
+        filename = os.path.join(directory.name, "bench.sav")
+        engine.save_as(filename)
+        load_game(filename)
+
+    return run
+
+
+# name -> (factory, parameter name, parameter values)
+BENCHMARKS: dict[str, tuple[Callable[..., Timed], str, list]] = {
+    "generate_dungeon": (bench_generate_dungeon, "map_size", MAP_SIZES),
+    "populate_room": (bench_populate_room, "floor", [1, 5, 10]),
+    "update_fov": (bench_update_fov, "map_size", MAP_SIZES),
+    "handle_enemy_turn": (bench_handle_enemy_turn, "enemies", ENTITY_COUNTS),
+    "get_path_to": (bench_get_path_to, "map_size", MAP_SIZES),
+    "game_map_render": (bench_game_map_render, "map_size", MAP_SIZES),
+    "render_messages": (bench_render_messages, "messages", MESSAGE_COUNTS),
+    "save_and_load": (bench_save_and_load, "map_size", MAP_SIZES),
+}
+
+
+def time_it(function: Timed, repeat: int, min_time: float) -> list[float]:
+    """
+    Return `repeat` samples of the mean time of a single call, in seconds
+    Each sample loops over `function` until at least `min_time` seconds elapsed
+    """
+    samples: list[float] = []
+    for _ in range(repeat):
+        number = 0
+        start = perf_counter()
+        while True:
+            function()
+            number += 1
+            elapsed = perf_counter() - start
+            if elapsed >= min_time:
+                break
+        samples.append(elapsed / number)
+    return samples
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Return the median and interquartile range of the samples"""
+    if len(samples) > 1:
+        q1, _, q3 = quantiles(samples, n=4, method="inclusive")
+    else:
+        q1 = q3 = samples[0]
+    return {"median": median(samples), "iqr": q3 - q1, "min": min(samples)}
+
+
+def metric_key(name: str, param_name: str, value: object) -> str:
+    """Stable identifier of a benchmark run, e.g. `update_fov[map_size=64x64]`"""
+    if isinstance(value, tuple):
+        value = "x".join(map(str, value))
+    return f"{name}[{param_name}={value}]"
+
+
+def run_suite(
+    names: list[str] | None = None, repeat: int = 5, min_time: float = 0.05
+) -> Iterator[dict]:
+    """Run the selected benchmarks and yield one result record per parameter"""
+    for name, (factory, param_name, values) in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        for value in values:
+            random.seed(SEED)
+            function = factory(value)
+            samples = time_it(function, repeat, min_time)
+            yield {
+                "key": metric_key(name, param_name, value),
+                "name": name,
+                "params": {param_name: value},
+                "unit": "s",
+                "samples": samples,
+                **summarize(samples),
+            }
+
+
+def run_report(
+    names: list[str] | None = None, repeat: int = 5, min_time: float = 0.05
+) -> dict:
+    """Run the suite and return a JSON-serializable report"""
+    results = []
+    for record in run_suite(names, repeat, min_time):
+        print(
+            f"{record['key']:<40} {record['median'] * 1000:10.3f} ms"
+            f" ± {record['iqr'] * 1000:.3f}",
+            file=sys.stderr,
+        )
+        results.append(record)
+
+    return {
+        "meta": {
+            "seed": SEED,
+            "repeat": repeat,
+            "min_time": min_time,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def argument_parser(
+    description: str = "Run the engine benchmarks.",
+    repeat: int = 5,
+    parents: Sequence[argparse.ArgumentParser] = (),
+) -> argparse.ArgumentParser:
+    """
+    Return a parser of the benchmark names and sampling options
+    The arguments of `parents` come first, e.g. the positionals of a command
+    """
+    parser = argparse.ArgumentParser(description=description, parents=list(parents))
+    parser.add_argument("names", nargs="*", help=f"any of {', '.join(BENCHMARKS)}")
+    parser.add_argument(
+        "--repeat", type=int, default=repeat, help="samples per benchmark"
+    )
+    parser.add_argument(
+        "--min-time", type=float, default=0.05, help="seconds spent per sample"
+    )
+    return parser
+
+
+def main() -> None:
+    parser = argument_parser()
+    parser.add_argument("-o", "--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+    if unknown := set(args.names) - set(BENCHMARKS):
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    report = run_report(args.names, args.repeat, args.min_time)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Window of the map shown on screen
+
+The camera follows the player over maps of any size, so only the tiles and
+entities inside the viewport are ever drawn. Positions are kept in map
+coordinates everywhere else, and translated here from and to the console.
+"""
+
+from __future__ import annotations
+
+
+class Camera:
+    """Viewport of `width` by `height` tiles, drawn at `location` on the console"""
+
+    def __init__(
+        self, width: int, height: int, location: tuple[int, int] = (0, 0)
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.screen_x, self.screen_y = location
+        # Map coordinates of the top left tile of the viewport
+        self.x = self.y = 0
+
+    def center_on(self, position: tuple[int, int], map_size: tuple[int, int]) -> None:
+        """Center the viewport on `position`, without going past the map edges"""
+        map_width, map_height = map_size
+        self.x = max(0, min(position[0] - self.width // 2, map_width - self.width))
+        self.y = max(0, min(position[1] - self.height // 2, map_height - self.height))
+
+    def in_view(self, position: tuple[int, int]) -> bool:
+        x, y = position
+        return self.x <= x < self.x + self.width and self.y <= y < self.y + self.height
+
+    def map_to_screen(self, position: tuple[int, int]) -> tuple[int, int]:
+        return (
+            position[0] - self.x + self.screen_x,
+            position[1] - self.y + self.screen_y,
+        )
+
+    def screen_to_map(self, position: tuple[int, int]) -> tuple[int, int] | None:
+        """Return the map position under a console tile, if inside the viewport"""
+        x, y = position[0] - self.screen_x, position[1] - self.screen_y
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return x + self.x, y + self.y
+        return None
+
+    def window(self, map_size: tuple[int, int]) -> tuple[slice, slice, slice, slice]:
+        """
+        Return the map and console slices of the part of the map in view,
+        as (map x, map y, console x, console y)
+        """
+        width = min(self.width, map_size[0] - self.x)
+        height = min(self.height, map_size[1] - self.y)
+        return (
+            slice(self.x, self.x + width),
+            slice(self.y, self.y + height),
+            slice(self.screen_x, self.screen_x + width),
+            slice(self.screen_y, self.screen_y + height),
+        )
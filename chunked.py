@@ -0,0 +1,272 @@
+"""
+Sparse storage of very large maps
+
+A `ChunkedGrid` splits a 2D array into square chunks. Chunks never written
+to take no memory at all, and only the most recently used chunks are kept
+as arrays, the others are compressed until accessed again. A chunk holding
+nothing but the fill value, e.g. solid rock, is dropped once compressed.
+
+The grid is indexed like the dense NumPy array it replaces: by position,
+negative ones included, by rectangular slices, which read and write dense
+windows, by `...`, by arrays of coordinates and by a boolean mask of the
+whole grid. Other keys raise `TypeError` or `IndexError`. Converting the
+whole grid with `np.asarray` works too, but is as expensive as the dense
+array it avoids.
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Iterator
+import zlib
+import numpy as np
+
+CHUNK_SIZE = 64
+# Chunks kept uncompressed, the least recently used ones are compressed
+MAX_HOT_CHUNKS = 64
+
+
+def _bounds(key: slice, length: int) -> tuple[int, int]:
+    start, stop, step = key.indices(length)
+    if step != 1:
+        raise IndexError("ChunkedGrid slices cannot have a step")
+    return start, max(start, stop)
+
+
+class _FieldView:
+    """Field of a grid with a structured dtype, e.g. `tiles["walkable"]`"""
+
+    def __init__(self, grid: ChunkedGrid, name: str) -> None:
+        self.grid = grid
+        self.name = name
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.grid.shape
+
+    def __getitem__(self, key: Any) -> Any:
+        return self.grid[key][self.name]
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        array = np.asarray(self.grid)[self.name]
+        return array if dtype is None else array.astype(dtype)
+
+
+class ChunkedGrid:
+    """Lazily allocated, compressed 2D grid with a dense array facade"""
+
+    def __init__(
+        self,
+        shape: tuple[int, int],
+        dtype: Any,
+        fill: Any,
+        chunk_size: int = CHUNK_SIZE,
+        max_hot: int = MAX_HOT_CHUNKS,
+    ) -> None:
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.fill = np.array(fill, dtype=self.dtype)
+        self.chunk_size = chunk_size
+        self.max_hot = max_hot
+        self.hot: OrderedDict[tuple[int, int], np.ndarray] = OrderedDict()
+        self.cold: dict[tuple[int, int], bytes] = {}
+
+    @property
+    def ndim(self) -> int:
+        return 2
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the chunks, compressed or not"""
+        return sum(chunk.nbytes for chunk in self.hot.values()) + sum(
+            len(data) for data in self.cold.values()
+        )
+
+    def chunk(self, key: tuple[int, int], create: bool) -> np.ndarray | None:
+        """
+        Return the chunk at `key`, decompressing it if needed
+        A chunk never written to is allocated only when `create` is set
+        """
+        chunk = self.hot.get(key)
+        if chunk is not None:
+            self.hot.move_to_end(key)
+            return chunk
+
+        size = self.chunk_size
+        data = self.cold.pop(key, None)
+        if data is not None:
+            chunk = np.frombuffer(zlib.decompress(data), dtype=self.dtype)
+            chunk = chunk.reshape((size, size), order="F").copy(order="F")
+        elif create:
+            chunk = np.full((size, size), self.fill, order="F")
+        else:
+            return None
+
+        self.hot[key] = chunk
+        while len(self.hot) > self.max_hot:
+            self.compress(*self.hot.popitem(last=False))
+        return chunk
+
+    def compress(self, key: tuple[int, int], chunk: np.ndarray) -> None:
+        if not (chunk == self.fill).all():
+            self.cold[key] = zlib.compress(chunk.tobytes(order="F"))
+
+    def chunks_in(
+        self, start: tuple[int, int], end: tuple[int, int]
+    ) -> Iterator[tuple[tuple[int, int], slice, slice, slice, slice]]:
+        """
+        Yield every chunk overlapping the rectangle from `start` to `end`,
+        with the slices of the overlap, in the chunk then in the rectangle
+        """
+        size = self.chunk_size
+        for cx in range(start[0] // size, (end[0] - 1) // size + 1):
+            for cy in range(start[1] // size, (end[1] - 1) // size + 1):
+                x0, y0 = max(start[0], cx * size), max(start[1], cy * size)
+                x1, y1 = min(end[0], (cx + 1) * size), min(end[1], (cy + 1) * size)
+                yield (
+                    (cx, cy),
+                    slice(x0 - cx * size, x1 - cx * size),
+                    slice(y0 - cy * size, y1 - cy * size),
+                    slice(x0 - start[0], x1 - start[0]),
+                    slice(y0 - start[1], y1 - start[1]),
+                )
+
+    def window(self, start: tuple[int, int], end: tuple[int, int]) -> np.ndarray:
+        """Return a dense copy of the rectangle from `start` up to `end` excluded"""
+        out = np.full((end[0] - start[0], end[1] - start[1]), self.fill, order="F")
+        if out.size:
+            for key, cx, cy, wx, wy in self.chunks_in(start, end):
+                chunk = self.chunk(key, create=False)
+                if chunk is not None:
+                    out[wx, wy] = chunk[cx, cy]
+        return out
+
+    def set_window(self, start: tuple[int, int], values: Any) -> None:
+        """Write a dense array (or a single value) at `start`"""
+        values = np.asarray(values, dtype=self.dtype)
+        if values.ndim == 0:
+            raise ValueError("set_window needs an array, use slices for a value")
+        end = start[0] + values.shape[0], start[1] + values.shape[1]
+        if values.size:
+            for key, cx, cy, wx, wy in self.chunks_in(start, end):
+                self.chunk(key, create=True)[cx, cy] = values[wx, wy]
+
+    def _rectangle(self, key: tuple[slice, slice]) -> tuple[tuple, tuple]:
+        x0, x1 = _bounds(key[0], self.shape[0])
+        y0, y1 = _bounds(key[1], self.shape[1])
+        return (x0, y0), (x1, y1)
+
+    def _locate(self, xs: np.ndarray, ys: np.ndarray) -> Iterator:
+        """Group coordinates by chunk, yielding (chunk key, selection, x, y)"""
+        size = self.chunk_size
+        keys = (xs // size) * (self.shape[1] // size + 1) + ys // size
+        for key in np.unique(keys).tolist():
+            selected = keys == key
+            x, y = xs[selected], ys[selected]
+            yield (int(x[0]) // size, int(y[0]) // size), selected, x % size, y % size
+
+    def _index(self, key: Any, length: int) -> Any:
+        """Check an index along one axis, with negative positions counted back"""
+        if isinstance(key, slice):
+            return key
+        if isinstance(key, (int, np.integer)) and not isinstance(key, bool):
+            if not -length <= key < length:
+                raise IndexError(f"index {key} is out of bounds for size {length}")
+            return int(key) % length
+        if isinstance(key, (np.ndarray, list)):
+            array = np.asarray(key)
+            if array.dtype.kind in "iu":
+                if not ((array >= -length) & (array < length)).all():
+                    raise IndexError(f"index out of bounds for size {length}")
+                return np.where(array < 0, array + length, array)
+            if array.dtype == bool:
+                raise IndexError("boolean masks must cover the whole grid")
+        raise TypeError(
+            "ChunkedGrid indices must be integers, slices, coordinate arrays"
+            f" or a boolean mask, not {type(key).__name__}"
+        )
+
+    def _key(self, key: Any) -> tuple[Any, Any]:
+        """Return `key` as a checked (x, y) pair, `...` and missing axes filled"""
+        if type(key) is tuple and len(key) == 2:
+            # Single positions are by far the most common, and checked first
+            x, y = key
+            if type(x) is int and type(y) is int:
+                if 0 <= x < self.shape[0] and 0 <= y < self.shape[1]:
+                    return x, y
+        if isinstance(key, np.ndarray) and key.dtype == bool:
+            if key.shape != self.shape:
+                raise IndexError(f"boolean mask of shape {key.shape}, not {self.shape}")
+            return np.nonzero(key)
+        if not isinstance(key, tuple):
+            key = (key,)
+        ellipses = [i for i, part in enumerate(key) if part is Ellipsis]
+        if len(ellipses) > 1:
+            raise IndexError("an index can only have a single ellipsis ('...')")
+        if ellipses:
+            i = ellipses[0]
+            key = key[:i] + (slice(None),) * (3 - len(key)) + key[i + 1 :]
+        key += (slice(None),) * (2 - len(key))
+        if len(key) != 2:
+            raise IndexError(f"too many indices for a 2D grid: {len(key)}")
+        x, y = (self._index(part, length) for part, length in zip(key, self.shape))
+        arrays = isinstance(x, np.ndarray) or isinstance(y, np.ndarray)
+        if arrays and (isinstance(x, slice) or isinstance(y, slice)):
+            raise IndexError("ChunkedGrid cannot mix slices and coordinate arrays")
+        return x, y
+
+    def _region(self, x: Any, y: Any) -> tuple[tuple, tuple, tuple[int, ...]]:
+        """
+        Return the rectangle of a key made of slices and positions, and the
+        shape of the result, without the axes indexed by a position
+        """
+        axes = [
+            part if isinstance(part, slice) else slice(part, part + 1)
+            for part in (x, y)
+        ]
+        start, end = self._rectangle((axes[0], axes[1]))
+        shape = tuple(
+            end[axis] - start[axis]
+            for axis, part in enumerate((x, y))
+            if isinstance(part, slice)
+        )
+        return start, end, shape
+
+    def __getitem__(self, key: Any) -> Any:
+        if isinstance(key, str):
+            return _FieldView(self, key)
+        x, y = self._key(key)
+        if isinstance(x, np.ndarray) or isinstance(y, np.ndarray):
+            xs, ys = np.broadcast_arrays(np.asarray(x), np.asarray(y))
+            out = np.full(xs.shape, self.fill)
+            for chunk_key, selected, cx, cy in self._locate(xs, ys):
+                chunk = self.chunk(chunk_key, create=False)
+                if chunk is not None:
+                    out[selected] = chunk[cx, cy]
+            return out
+        if isinstance(x, slice) or isinstance(y, slice):
+            start, end, shape = self._region(x, y)
+            return self.window(start, end).reshape(shape, order="F")
+        chunk = self.chunk((x // self.chunk_size, y // self.chunk_size), False)
+        if chunk is None:
+            return self.fill[()]
+        return chunk[x % self.chunk_size, y % self.chunk_size]
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        x, y = self._key(key)
+        if isinstance(x, np.ndarray) or isinstance(y, np.ndarray):
+            xs, ys = np.broadcast_arrays(np.asarray(x), np.asarray(y))
+            values = np.broadcast_to(np.asarray(value, dtype=self.dtype), xs.shape)
+            for chunk_key, selected, cx, cy in self._locate(xs, ys):
+                self.chunk(chunk_key, create=True)[cx, cy] = values[selected]
+            return
+        if isinstance(x, slice) or isinstance(y, slice):
+            start, end, shape = self._region(x, y)
+            values = np.broadcast_to(np.asarray(value, dtype=self.dtype), shape)
+            window = end[0] - start[0], end[1] - start[1]
+            return self.set_window(start, values.reshape(window, order="F"))
+        size = self.chunk_size
+        self.chunk((x // size, y // size), create=True)[x % size, y % size] = value
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        array = self.window((0, 0), self.shape)
+        return array if dtype is None else array.astype(dtype)
@@ -10,6 +10,7 @@ decend = (0x9F, 0x3F, 0xFF)
 
 player_die = (0xFF, 0x30, 0x30)
 enemy_die = (0xFF, 0xA0, 0x30)
+corpse = (0xBF, 0x0, 0x0)
 
 invalid = (0xFF, 0xFF, 0x00)
 impossible = (0x80, 0x80, 0x80)
@@ -22,5 +23,8 @@ bar_text = white
 bar_filled = (0x0, 0x60, 0x0)
 bar_empty = (0x40, 0x10, 0x10)
 
+minimap_floor = (0x50, 0x50, 0x96)
+minimap_wall = (0x20, 0x20, 0x40)
+
 menu_title = (255, 255, 63)
 menu_text = white
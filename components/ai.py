@@ -1,7 +1,9 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
-from random import choice
+from math import isqrt
+from random import choice, randint
 from action import Action, MovementAction, MeleeAction, WaitAction, BumpAction
+from chunked import ChunkedGrid
 import numpy as np
 import tcod
 
@@ -9,24 +11,102 @@ if TYPE_CHECKING:
     from entity import Actor
 
 
+DIRECTIONS = [(-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)]
+# Tiles around the bounding box of a path start and goal that are searched
+# first on chunked maps
+PATH_MARGIN = 16
+
+
 class BaseAI(Action):
+    def perform(self) -> Action | None:
+        """
+        Take a turn of the entity
+        Return the action performed, its cost delays the next turn
+        """
+        raise NotImplementedError
+
+    def act(self, action: Action) -> Action:
+        """Perform `action` and return it"""
+        action.perform()
+        return action
+
     def get_path_to(self, destination: tuple[int, int]) -> list[tuple[int, int]]:
         """
         Compute path to the target position
         If no valid path, return empty list
         """
-        cost = np.array(self.entity.game_map.tiles["walkable"], dtype=np.int8)
+        game_map = self.entity.game_map
+        if isinstance(game_map.tiles, ChunkedGrid):
+            # Search a window around both ends first, the whole map only when
+            # the path has to leave it
+            (x0, y0), (x1, y1) = np.sort([self.entity.position, destination], 0)
+            path = self.get_path_within(
+                (max(0, int(x0) - PATH_MARGIN), max(0, int(y0) - PATH_MARGIN)),
+                (
+                    min(game_map.width, int(x1) + PATH_MARGIN + 1),
+                    min(game_map.height, int(y1) + PATH_MARGIN + 1),
+                ),
+                destination,
+            )
+            if path:
+                return path
+        return self.get_path_within(
+            (0, 0), (game_map.width, game_map.height), destination
+        )
 
-        for entity in self.entity.game_map.entities:
-            if entity.blocks_movement and cost[entity.position]:
-                cost[entity.position] += 10
+    def get_path_within(
+        self,
+        start: tuple[int, int],
+        end: tuple[int, int],
+        destination: tuple[int, int],
+    ) -> list[tuple[int, int]]:
+        """Compute a path staying inside the rectangle from `start` to `end`"""
+        game_map = self.entity.game_map
+        (x0, y0), (x1, y1) = start, end
+        cost = np.array(game_map.tiles[x0:x1, y0:y1]["walkable"], dtype=np.int8)
+
+        # Other actors are walkable, but a detour is preferred
+        xs, ys = (game_map.actor_positions.positions - start).T
+        inside = (xs >= 0) & (ys >= 0) & (xs < x1 - x0) & (ys < y1 - y0)
+        xs, ys = xs[inside], ys[inside]
+        blocked = cost[xs, ys] > 0
+        cost[xs[blocked], ys[blocked]] += 10
 
         graph = tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=3)
         pathfinder = tcod.path.Pathfinder(graph)
-        pathfinder.add_root(self.entity.position)
+        pathfinder.add_root((self.entity.x - x0, self.entity.y - y0))
+
+        path = pathfinder.path_to((destination[0] - x0, destination[1] - y0))
+        return [(index[0] + x0, index[1] + y0) for index in path[1:].tolist()]
 
-        path = pathfinder.path_to(destination)[1:].tolist()
-        return [(index[0], index[1]) for index in path]
+    def perform_coarse(self) -> Action | None:
+        """
+        Cheap stand-in for `perform`, used while far away from the player
+        By default the entity wanders around
+        """
+        return self.act(MovementAction(self.entity, *choice(DIRECTIONS)))
+
+    def hear(self, position: tuple[int, int]) -> None:
+        """Called when a noise at `position` wakes this entity up"""
+
+    def catch_up(self, turns: int) -> None:
+        """
+        Approximate the given amount of turns spent dormant
+        A random walk of `turns` steps ends around `sqrt(turns)` tiles away,
+        so the entity is moved to a random free tile within that distance
+        """
+        game_map = self.entity.game_map
+        distance = min(isqrt(turns), 16)
+        for _ in range(8):
+            x = self.entity.x + randint(-distance, distance)
+            y = self.entity.y + randint(-distance, distance)
+            if (
+                game_map.in_bounds(x, y)
+                and game_map.tiles["walkable"][x, y]
+                and not game_map.get_blocking_entity_at((x, y))
+            ):
+                self.entity.place((x, y))
+                return
 
 
 class HostileEnemy(BaseAI):
@@ -34,23 +114,36 @@ class HostileEnemy(BaseAI):
         super().__init__(entity)
         self.path: list[tuple[int, int]] = []
 
-    def perform(self) -> None:
+    def perform(self) -> Action | None:
         target = self.engine.player
 
         if self.engine.game_map.visible[self.entity.position]:
             dx = target.x - self.entity.x
             dy = target.y - self.entity.y
             if max(abs(dx), abs(dy)) <= 1:
-                return MeleeAction(self.entity, dx, dy).perform()
+                return self.act(MeleeAction(self.entity, dx, dy))
             self.path = self.get_path_to(target.position)
 
         if self.path:
             x, y = self.path.pop(0)
             dx = x - self.entity.x
             dy = y - self.entity.y
-            return MovementAction(self.entity, dx, dy).perform()
+            return self.act(MovementAction(self.entity, dx, dy))
+
+        return self.act(WaitAction(self.entity))
+
+    def perform_coarse(self) -> Action | None:
+        """Keep following the last known path, otherwise stay put"""
+        if self.path:
+            return self.perform()
+        return self.act(WaitAction(self.entity))
 
-        return WaitAction(self.entity).perform()
+    def hear(self, position: tuple[int, int]) -> None:
+        self.path = self.get_path_to(position)
+
+    def catch_up(self, turns: int) -> None:
+        self.path = []
+        super().catch_up(turns)
 
 
 class ConfusedEnemy(BaseAI):
@@ -66,16 +159,27 @@ class ConfusedEnemy(BaseAI):
         self.previous_ai = previous_ai
         self.turns_remaining = turns_remaining
 
-    def perform(self) -> None:
+    def perform(self) -> Action | None:
         if self.turns_remaining <= 0:
-            self.engine.message_log.add_message(
-                f"The {self.entity.name} is no longer confused."
-            )
+            self.engine.message_log.add("confusion.end", target=self.entity.name)
             self.entity.ai = self.previous_ai
             return None
 
-        random_direction = choice(
-            [(-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)]
-        )
+        random_direction = choice(DIRECTIONS)
         self.turns_remaining -= 1
-        return BumpAction(self.entity, *random_direction).perform()
+        return self.act(BumpAction(self.entity, *random_direction).resolve())
+
+    def perform_coarse(self) -> Action | None:
+        self.turns_remaining -= 1
+        if self.turns_remaining <= 0:
+            self.entity.ai = self.previous_ai
+
+    def catch_up(self, turns: int) -> None:
+        """The confusion wears off while dormant, then the previous ai goes on"""
+        self.turns_remaining -= turns
+        if self.turns_remaining <= 0:
+            self.entity.ai = self.previous_ai
+            if self.previous_ai:
+                self.previous_ai.catch_up(-self.turns_remaining)
+        else:
+            super().catch_up(turns)
@@ -5,15 +5,19 @@ from components.base_component import BaseComponent
 from components.inventory import Inventory
 from action import Action, ItemAction
 from exception import Impossible
-from input_handling import (
-    SingleRangedAttackHandler,
-    AreaRangedAttackHandler,
-    BaseEventHandler,
-)
+from events import Consume, events
 import color
 
 if TYPE_CHECKING:
     from entity import Actor, Item
+    from input_handling import (
+        SingleRangedAttackHandler,
+        AreaRangedAttackHandler,
+        BaseEventHandler,
+    )
+
+# How far, in tiles, thunder and explosions can be heard
+EXPLOSION_NOISE = 48
 
 
 class Consumable(BaseComponent):
@@ -36,6 +40,7 @@ class Consumable(BaseComponent):
         inventory = item.parent
         if isinstance(inventory, Inventory):
             inventory.items.remove(item)
+            events.publish(Consume, inventory.parent, item)
 
     @property
     def description(self) -> str:
@@ -53,9 +58,11 @@ class HealingConsumable(Consumable):
         if amount_recovered <= 0:
             raise Impossible("Your health already full.")
 
-        self.engine.message_log.add_message(
-            f"You consume {self.parent.name} and recover {amount_recovered} HP!",
+        self.engine.message_log.add(
+            "heal",
             color.health_recovered,
+            item=self.parent.name,
+            amount=amount_recovered,
         )
         self.consume()
 
@@ -71,24 +78,17 @@ class LightningDamageConsumable(Consumable):
 
     def activate(self, action: ItemAction) -> None:
         consumer = action.entity
-        target = None
-        closest_distance = self.maximum_range + 1.0
-
-        for actor in self.engine.game_map.actors:
-            if actor is not consumer and self.engine.game_map.visible[actor.position]:
-                distance = consumer.distance_between(*actor.position)
-
-                if distance < closest_distance:
-                    target = actor
-                    closest_distance = distance
-
-        if not target:
+        # Anything closer than one tile past the range can be struck
+        reach = self.maximum_range + 1.0
+        target = self.engine.game_map.nearest_visible_actor(
+            consumer.position, reach, exclude=consumer
+        )
+        if not target or consumer.distance_between(*target.position) >= reach:
             raise Impossible("No enemy is close enough to strike.")
 
-        self.engine.message_log.add_message(
-            f"A lightning bolt strikes the {target.name} with loud thunder, for {self.damage} damage!"
-        )
-        target.fighter.take_damage(self.damage)
+        self.engine.message_log.add("lightning", target=target.name, damage=self.damage)
+        self.engine.game_map.activation.make_noise(target.position, EXPLOSION_NOISE)
+        target.fighter.take_damage(self.damage, self.parent.name)
         self.consume()
 
     @property
@@ -101,6 +101,8 @@ class ConfusionConsumable(Consumable):
         self.number_of_turns = number_of_turns
 
     def action(self, consumer: Actor) -> SingleRangedAttackHandler:
+        from input_handling import SingleRangedAttackHandler
+
         self.engine.message_log.add_message(
             "Select a target location.", color.needs_target
         )
@@ -119,9 +121,7 @@ class ConfusionConsumable(Consumable):
         if consumer is target:
             raise Impossible("You cannot target yourself.")
 
-        self.engine.message_log.add_message(
-            f"The {target.name} eyes look vacant, as it starts to stumble around!"
-        )
+        self.engine.message_log.add("confusion", target=target.name)
         target.ai = ConfusedEnemy(target, target.ai, self.number_of_turns)
         self.consume()
 
@@ -138,6 +138,8 @@ class FireballDamageConsumable(Consumable):
         self.damage = damage
 
     def action(self, consumer: Actor) -> AreaRangedAttackHandler:
+        from input_handling import AreaRangedAttackHandler
+
         self.engine.message_log.add_message(
             "Select a target location.", color.needs_target
         )
@@ -151,17 +153,20 @@ class FireballDamageConsumable(Consumable):
         if not self.engine.game_map.visible[action.target_position]:
             raise Impossible("You cannot target something that you cannot see.")
 
-        is_target_hit = False
-        for actor in self.engine.game_map.actors:
-            if actor.distance_between(*action.target_position) <= self.radius:
-                self.engine.message_log.add_message(
-                    f"The {actor.name} is engulfed in a fiery explosion, taking {self.damage} damage!"
-                )
-                actor.fighter.take_damage(self.damage)
-                is_target_hit = True
+        targets = self.engine.game_map.actors_within(
+            action.target_position, self.radius
+        )
+        for actor in targets:
+            self.engine.message_log.add(
+                "fireball", target=actor.name, damage=self.damage
+            )
+            actor.fighter.take_damage(self.damage, self.parent.name)
 
-        if not is_target_hit:
+        if not targets:
             raise Impossible("There are no targets in the radius.")
+        self.engine.game_map.activation.make_noise(
+            action.target_position, EXPLOSION_NOISE
+        )
         self.consume()
 
     @property
@@ -2,6 +2,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 from components.base_component import BaseComponent
 from equipment_type import EquipmentType
+from events import Equip, events
 
 if TYPE_CHECKING:
     from entity import Item, Actor
@@ -77,19 +78,19 @@ class Equipment(BaseComponent):
         if current_item is not None:
             self.unequip_from_slot(slot, add_message)
         setattr(self, slot, item)
+        events.publish(Equip, self.parent, item, slot, True)
 
         if add_message:
-            self.parent.game_map.engine.message_log.add_message(
-                f"You equip the {item.name}."
-            )
+            self.parent.game_map.engine.message_log.add("equip", item=item.name)
 
     def unequip_from_slot(self, slot: str, add_message: bool) -> None:
         current_item: Item = getattr(self, slot)
         setattr(self, slot, None)
+        events.publish(Equip, self.parent, current_item, slot, False)
 
         if add_message:
-            self.parent.game_map.engine.message_log.add_message(
-                f"You remove the {current_item.name}."
+            self.parent.game_map.engine.message_log.add(
+                "unequip", item=current_item.name
             )
 
     def toggle_equip(self, item: Item, add_message: bool = True) -> None:
@@ -2,6 +2,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 from components.base_component import BaseComponent
 from render_order import RenderOrder
+from events import Damage, Death, events
 import color
 
 if TYPE_CHECKING:
@@ -19,6 +20,8 @@ class Fighter(BaseComponent):
         self.base_power = base_power
         self.base_defense = base_defense
         self.base_luck = base_luck
+        # Name of whatever hurt this fighter last, i.e. its killer once dead
+        self.last_damage_source: str | None = None
 
     @property
     def hp(self) -> int:
@@ -27,6 +30,8 @@ class Fighter(BaseComponent):
     @hp.setter
     def hp(self, value: int) -> None:
         self._hp = max(0, min(value, self.max_hp))
+        if hasattr(self.parent, "parent"):
+            self.game_map.state_hash.update(self.parent)
         if self._hp == 0 and self.parent.ai:
             self.die()
 
@@ -60,22 +65,32 @@ class Fighter(BaseComponent):
         self.hp = new_hp_value
         return amount_recovered
 
-    def take_damage(self, amount: int) -> None:
+    def take_damage(self, amount: int, source: str | None = None) -> None:
+        if source is not None:
+            self.last_damage_source = source
+        events.publish(Damage, self.parent, amount, source)
         self.hp -= amount
 
     def die(self) -> None:
+        events.publish(Death, self.parent, self.last_damage_source)
         if self.engine.player is self.parent:
             self.engine.message_log.add_message("You died!", color.player_die)
         else:
-            self.engine.message_log.add_message(
-                f"{self.parent.name} is dead!", color.enemy_die
-            )
+            self.engine.message_log.add("death", color.enemy_die, name=self.parent.name)
 
-        self.parent.char = "%"
-        self.parent.color = (191, 0, 0)
-        self.parent.blocks_movement = False
         self.parent.ai = None
-        self.parent.name = f"remains of {self.parent.name}"
-        self.parent.render_order = RenderOrder.CORPSE
+        remains = f"remains of {self.parent.name}"
+        if self.engine.player is self.parent:
+            # The player stays on the map, for the game over screen
+            self.parent.char = "%"
+            self.parent.color = color.corpse
+            self.parent.blocks_movement = False
+            self.parent.name = remains
+            self.parent.render_order = RenderOrder.CORPSE
+            self.game_map.handle_death(self.parent)
+        else:
+            # Others are reduced to a decal, the actor itself is dropped
+            self.game_map.add_decal(self.parent.position, "%", color.corpse, remains)
+            self.game_map.remove_entity(self.parent)
 
         self.engine.player.level.add_xp(self.parent.level.xp_given)
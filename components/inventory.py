@@ -19,4 +19,4 @@ class Inventory(BaseComponent):
         """
         self.items.remove(item)
         item.place(self.parent.position, self.game_map)
-        self.engine.message_log.add_message(f"You dropped the {item.name}.")
+        self.engine.message_log.add("drop", item=item.name)
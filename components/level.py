@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 from components.base_component import BaseComponent
+from events import LevelUp, events
 
 if TYPE_CHECKING:
     from entity import Actor
@@ -19,6 +20,7 @@ class Level(BaseComponent):
     ) -> None:
         self.current_level = current_level
         self.current_xp = current_xp
+        self.total_xp = current_xp
         self.level_up_base = level_up_base
         self.level_up_factor = level_up_factor
         self.xp_given = xp_given
@@ -36,16 +38,16 @@ class Level(BaseComponent):
             return
 
         self.current_xp += xp
-        self.engine.message_log.add_message(f"You gain {xp} experience points.")
+        self.total_xp += xp
+        self.engine.message_log.add("xp", xp=xp)
 
         if self.requires_level_up:
-            self.engine.message_log.add_message(
-                f"You advance to level {self.current_level + 1}!"
-            )
+            self.engine.message_log.add("level_up", level=self.current_level + 1)
 
     def increase_level(self) -> None:
         self.current_xp -= self.experience_to_next_level
         self.current_level += 1
+        events.publish(LevelUp, self.parent, self.current_level)
 
     def increase_max_hp(self, amount: int = 20) -> None:
         self.parent.fighter.max_hp += amount
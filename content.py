@@ -0,0 +1,296 @@
+"""
+Registry of the game content: monsters, items, spawn weights and floor caps
+
+Content is declared in `assets/content.json`. The file is validated once, and
+compiled into plain tables which are cached next to it, in `__pycache__`,
+under the hash of its bytes. Editing the file compiles it again, otherwise
+loading the content only means unpickling the cached tables, which is what
+worker processes do too.
+
+Prototypes are only built the first time their ID is asked for.
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any
+from exception import ContentError
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import pickle
+import tempfile
+
+if TYPE_CHECKING:
+    from entity import Actor, Entity, Item
+
+CONTENT_FILE = os.path.join(os.path.dirname(__file__), "assets", "content.json")
+# Bump when the compiled tables change shape, so old caches are ignored
+COMPILED_VERSION = 1
+
+# Modules component types can be picked from, by kind
+COMPONENT_MODULES = {
+    "ai": "components.ai",
+    "consumable": "components.consumable",
+    "equippable": "components.equippable",
+}
+SPAWN_KINDS = {"enemies": "actors", "items": "items"}
+ENTITY_FIELDS = {"name": str, "char": str, "color": list}
+ACTOR_FIELDS = {"ai": str, "fighter": dict, "level": dict, "inventory": int}
+ITEM_FIELDS = {"consumable": dict, "equippable": str}
+
+
+def component_type(kind: str, name: str) -> type:
+    """Return the component class called `name` among those of `kind`"""
+    component = getattr(importlib.import_module(COMPONENT_MODULES[kind]), name, None)
+    if not isinstance(component, type):
+        raise ContentError(f"Unknown {kind} type {name!r}")
+    return component
+
+
+def check_arguments(where: str, function: Any, arguments: dict[str, Any]) -> None:
+    try:
+        inspect.signature(function).bind(**arguments)
+    except TypeError as error:
+        raise ContentError(f"{where}: {error}") from None
+
+
+def check_entity(where: str, spec: Any, fields: dict[str, type]) -> None:
+    """Check the fields of an actor or item, and those every entity has"""
+    if not isinstance(spec, dict):
+        raise ContentError(f"{where} must be an object")
+    for field, value in spec.items():
+        kind = fields.get(field)
+        if kind is None:
+            raise ContentError(f"{where}: unknown field {field!r}")
+        if not isinstance(value, kind):
+            raise ContentError(f"{where}.{field} must be a {kind.__name__}")
+    for field in ENTITY_FIELDS:
+        if field not in spec:
+            raise ContentError(f"{where}: missing field {field!r}")
+    color = spec["color"]
+    if len(color) != 3 or not all(
+        isinstance(value, int) and 0 <= value <= 255 for value in color
+    ):
+        raise ContentError(f"{where}.color must be three integers from 0 to 255")
+    if len(spec["char"]) != 1:
+        raise ContentError(f"{where}.char must be a single character")
+
+
+def is_pair(entry: Any) -> bool:
+    return isinstance(entry, list) and len(entry) == 2
+
+
+def validate(content: Any) -> None:
+    """Raise `ContentError` on the first mistake found in `content`"""
+    from components.fighter import Fighter
+    from components.level import Level
+
+    if not isinstance(content, dict):
+        raise ContentError("Content must be an object")
+    for section in ("actors", "items", "spawns", "floor_caps"):
+        if not isinstance(content.get(section), dict):
+            raise ContentError(f"Missing section {section!r}")
+
+    for id, spec in content["actors"].items():
+        where = f"actors.{id}"
+        check_entity(where, spec, ENTITY_FIELDS | ACTOR_FIELDS)
+        for field in ("ai", "fighter"):
+            if field not in spec:
+                raise ContentError(f"{where}: missing field {field!r}")
+        component_type("ai", spec["ai"])
+        check_arguments(f"{where}.fighter", Fighter, spec["fighter"])
+        check_arguments(f"{where}.level", Level, spec.get("level", {}))
+
+    for id, spec in content["items"].items():
+        where = f"items.{id}"
+        check_entity(where, spec, ENTITY_FIELDS | ITEM_FIELDS)
+        if "consumable" in spec:
+            arguments = dict(spec["consumable"])
+            consumable = component_type("consumable", arguments.pop("type", ""))
+            check_arguments(f"{where}.consumable", consumable, arguments)
+        if "equippable" in spec:
+            component_type("equippable", spec["equippable"])
+
+    for kind, section in SPAWN_KINDS.items():
+        floors = content["spawns"].get(kind, {})
+        if not isinstance(floors, dict):
+            raise ContentError(f"spawns.{kind} must be an object")
+        for floor, chances in floors.items():
+            where = f"spawns.{kind}.{floor}"
+            if not floor.isdigit():
+                raise ContentError(f"{where}: floors must be integers")
+            if not isinstance(chances, list):
+                raise ContentError(f"{where} must be a list of [id, weight]")
+            for index, entry in enumerate(chances):
+                if not is_pair(entry):
+                    raise ContentError(f"{where}[{index}] must be an [id, weight] pair")
+                id, weight = entry
+                if not isinstance(id, str) or id not in content[section]:
+                    raise ContentError(f"{where}[{index}]: unknown {section} {id!r}")
+                if not isinstance(weight, int) or weight <= 0:
+                    raise ContentError(
+                        f"{where}[{index}]: weights must be positive integers"
+                    )
+
+        where = f"floor_caps.{kind}"
+        caps = content["floor_caps"].get(kind)
+        if not isinstance(caps, list) or not caps:
+            raise ContentError(f"{where} must be a list of [floor, cap]")
+        for index, entry in enumerate(caps):
+            if not is_pair(entry) or not all(isinstance(value, int) for value in entry):
+                raise ContentError(
+                    f"{where}[{index}] must be a [floor, cap] of integers"
+                )
+
+
+def compile_content(content: dict[str, Any]) -> dict[str, Any]:
+    """
+    Turn validated content into the tables the registry reads:
+    prototype specs by ID, spawn chances sorted by floor and floor caps
+    """
+    return {
+        "version": COMPILED_VERSION,
+        "actors": content["actors"],
+        "items": content["items"],
+        "spawns": {
+            kind: sorted(
+                (int(floor), [(id, weight) for id, weight in chances])
+                for floor, chances in content["spawns"].get(kind, {}).items()
+            )
+            for kind in SPAWN_KINDS
+        },
+        "floor_caps": {
+            kind: [(floor, cap) for floor, cap in content["floor_caps"][kind]]
+            for kind in SPAWN_KINDS
+        },
+    }
+
+
+def cache_path(path: str, digest: str) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(
+        os.path.dirname(path), "__pycache__", f"{stem}.{digest[:16]}.pickle"
+    )
+
+
+def load_tables(path: str = CONTENT_FILE) -> dict[str, Any]:
+    """Return the compiled tables of a content file, compiling it if needed"""
+    with open(path, "rb") as file:
+        data = file.read()
+    cached = cache_path(path, hashlib.sha256(data).hexdigest())
+    try:
+        with open(cached, "rb") as file:
+            tables = pickle.load(file)
+        if tables.get("version") == COMPILED_VERSION:
+            return tables
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    try:
+        content = json.loads(data)
+    except ValueError as error:
+        raise ContentError(f"{path}: {error}") from None
+    validate(content)
+    tables = compile_content(content)
+    try:
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        # Written aside then renamed, as worker processes may compile together
+        with tempfile.NamedTemporaryFile(
+            "wb", dir=os.path.dirname(cached), delete=False
+        ) as file:
+            pickle.dump(tables, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(file.name, cached)
+    except OSError:
+        pass
+    return tables
+
+
+class Registry:
+    """Content of the game, prototypes are built on first use"""
+
+    def __init__(self, path: str = CONTENT_FILE) -> None:
+        self.path = path
+        self._tables: dict[str, Any] | None = None
+        self.prototypes: dict[str, Entity] = {}
+        self.chances: dict[str, dict[int, list[tuple[Entity, int]]]] = {}
+
+    def load(self) -> dict[str, Any]:
+        """Load the content tables now, if not done yet, and return them"""
+        if self._tables is None:
+            self._tables = load_tables(self.path)
+        return self._tables
+
+    @property
+    def tables(self) -> dict[str, Any]:
+        return self.load()
+
+    def ids(self, section: str) -> list[str]:
+        """IDs of the "actors" or "items" section"""
+        return list(self.tables[section])
+
+    def prototype(self, id: str) -> Entity:
+        """Return the prototype with the given ID, raise `KeyError` if none"""
+        prototype = self.prototypes.get(id)
+        if prototype is None:
+            tables = self.tables
+            if id in tables["actors"]:
+                prototype = build_actor(tables["actors"][id])
+            elif id in tables["items"]:
+                prototype = build_item(tables["items"][id])
+            else:
+                raise KeyError(id)
+            self.prototypes[id] = prototype
+        return prototype
+
+    def spawn_chances(self, kind: str) -> dict[int, list[tuple[Entity, int]]]:
+        """Weighted prototypes of "enemies" or "items", by first floor"""
+        chances = self.chances.get(kind)
+        if chances is None:
+            chances = self.chances[kind] = {
+                floor: [(self.prototype(id), weight) for id, weight in entries]
+                for floor, entries in self.tables["spawns"][kind]
+            }
+        return chances
+
+    def floor_caps(self, kind: str) -> list[tuple[int, int]]:
+        """(floor, cap) steps of the "enemies" or "items" per room"""
+        return self.tables["floor_caps"][kind]
+
+
+def build_actor(spec: dict[str, Any]) -> Actor:
+    from components.fighter import Fighter
+    from components.inventory import Inventory
+    from components.level import Level
+    from entity import Actor
+
+    return Actor(
+        component_type("ai", spec["ai"]),
+        Fighter(**spec["fighter"]),
+        Level(**spec.get("level", {})),
+        spec["name"],
+        spec["char"],
+        tuple(spec["color"]),
+        inventory=Inventory(spec.get("inventory", 0)),
+    )
+
+
+def build_item(spec: dict[str, Any]) -> Item:
+    from entity import Item
+
+    consumable = equippable = None
+    if "consumable" in spec:
+        arguments = dict(spec["consumable"])
+        consumable = component_type("consumable", arguments.pop("type"))(**arguments)
+    if "equippable" in spec:
+        equippable = component_type("equippable", spec["equippable"])()
+    return Item(
+        spec["name"],
+        spec["char"],
+        tuple(spec["color"]),
+        consumable=consumable,
+        equippable=equippable,
+    )
+
+
+registry = Registry()
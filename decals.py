@@ -0,0 +1,79 @@
+"""
+Marks left on the floor of a map, such as the remains of the dead
+
+A decal is only a position, a glyph, a color and a label, stored in a NumPy
+structured array instead of keeping a whole entity around. Labels are
+interned, so a thousand dead orcs share a single string.
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING, Iterator
+import numpy as np
+
+if TYPE_CHECKING:
+    from tcod.console import Console
+    from camera import Camera
+
+decal_dt = np.dtype(
+    [
+        ("x", np.int32),
+        ("y", np.int32),
+        ("ch", np.int32),
+        ("fg", "3B"),
+        ("label", np.int32),
+    ]
+)
+
+
+class DecalLayer:
+    """Every decal of a map, drawn beneath its items and actors"""
+
+    def __init__(self, capacity: int = 16) -> None:
+        self.array = np.zeros(capacity, dtype=decal_dt)
+        self.count = 0
+        self.labels: list[str] = []
+        self.label_ids: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def data(self) -> np.ndarray:
+        return self.array[: self.count]
+
+    def add(
+        self,
+        position: tuple[int, int],
+        char: str,
+        color: tuple[int, int, int],
+        label: str,
+    ) -> None:
+        label_id = self.label_ids.get(label)
+        if label_id is None:
+            label_id = self.label_ids[label] = len(self.labels)
+            self.labels.append(label)
+        if self.count == len(self.array):
+            self.array = np.resize(self.array, self.count * 2)
+        self.array[self.count] = (*position, ord(char), color, label_id)
+        self.count += 1
+
+    def __iter__(self) -> Iterator[tuple[tuple[int, int], str]]:
+        """Yield every decal as (position, label)"""
+        for x, y, label_id in self.data[["x", "y", "label"]].tolist():
+            yield (x, y), self.labels[label_id]
+
+    def labels_at(self, position: tuple[int, int]) -> list[str]:
+        data = self.data
+        here = (data["x"] == position[0]) & (data["y"] == position[1])
+        return [self.labels[label_id] for label_id in data["label"][here].tolist()]
+
+    def render(self, console: Console, visible: np.ndarray, camera: Camera) -> None:
+        """Draw the decals in view standing on `visible` tiles"""
+        data = self.data
+        x, y = data["x"] - camera.x, data["y"] - camera.y
+        in_view = (x >= 0) & (y >= 0) & (x < camera.width) & (y < camera.height)
+        data, x, y = data[in_view], x[in_view], y[in_view]
+        seen = visible[data["x"], data["y"]]
+        x, y = x[seen] + camera.screen_x, y[seen] + camera.screen_y
+        console.tiles_rgb["ch"][x, y] = data["ch"][seen]
+        console.tiles_rgb["fg"][x, y] = data["fg"][seen]
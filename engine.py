@@ -4,7 +4,13 @@ import tcod
 from tcod.console import Console
 from tcod.map import compute_fov
 from message_log import MessageLog
+from camera import Camera
 from exception import Impossible
+from instrumentation import metrics
+from tracing import tracer
+from scheduler import ACTION_COST, action_delay
+from activation import COARSE_INTERVAL, COARSE_RADIUS, Tier
+from time import perf_counter
 import lzma
 import pickle
 
@@ -14,6 +20,10 @@ if TYPE_CHECKING:
     from entity import Actor
     from game_map import GameMap, GameWorld
 
+# Part of the console the map is drawn on, maps can be larger than that
+VIEWPORT_SIZE = 64, 64
+FOV_RADIUS = 8
+
 
 class Engine:
     game_map: GameMap
@@ -24,32 +34,108 @@ class Engine:
         self.message_log = MessageLog()
         self.mouse_location: tuple[int, int] = (0, 0)
         self.is_mouse_motion: bool = False
+        self.camera = Camera(*VIEWPORT_SIZE)
+
+    def handle_enemy_turn(self, player_cost: int = ACTION_COST) -> None:
+        """
+        Advance the turn timeline until it is the player's turn again
+        `player_cost` is the energy spent by the action the player just took
+        """
+        scheduler = self.game_map.scheduler
+        scheduler.reschedule(self.player, player_cost)
+        activation = self.game_map.activation
+        activation.wake_near(self.player.position, COARSE_RADIUS)
+        timed = metrics.enabled or tracer.enabled
+
+        while self.player.is_alive:
+            enemy = scheduler.peek()
+            if enemy is None or enemy is self.player:
+                break
+            scheduler.pop()
 
-    def handle_enemy_turn(self) -> None:
-        for enemy in set(self.game_map.actors) - {self.player}:
-            if enemy.ai:
+            tier = activation.tier_of(enemy, self.player.position)
+            if tier is Tier.DORMANT:
+                activation.sleep(enemy)
+                continue
+
+            action = None
+            if enemy.ai and tier is Tier.COARSE:
                 try:
-                    enemy.ai.perform()
+                    action = enemy.ai.perform_coarse()
                 except Impossible:
                     pass
+            elif enemy.ai:
+                if timed:
+                    ai_name = type(enemy.ai).__name__
+                    start = perf_counter()
+                try:
+                    action = enemy.ai.perform()
+                except Impossible:
+                    pass
+                if timed:
+                    end = perf_counter()
+                    if metrics.enabled:
+                        metrics.record(f"enemy_turn.{ai_name}", end - start)
+                    if tracer.enabled:
+                        tracer.add(f"{ai_name} ({enemy.name})", "ai", start, end)
+
+            if enemy.is_alive and enemy.parent is self.game_map:
+                # The action taken sets the next turn, a regular turn when
+                # nothing could be done
+                cost = action.cost if action else ACTION_COST
+                delay = action_delay(cost, enemy.speed)
+                if tier is Tier.COARSE:
+                    delay *= COARSE_INTERVAL
+                scheduler.add(enemy, delay)
 
     def save_as(self, filename: str) -> None:
         """Save this engine instance in compressed file."""
-        save_data = lzma.compress(pickle.dumps(self))
-        with open(filename, "wb") as file:
-            file.write(save_data)
+        with tracer.span("save", "io"):
+            save_data = lzma.compress(pickle.dumps(self))
+            with open(filename, "wb") as file:
+                file.write(save_data)
 
     def update_fov(self) -> None:
-        """Recompute visible area based on the player POV"""
-        self.game_map.visible[:] = compute_fov(
-            self.game_map.tiles["transparent"],
-            self.player.info[0:2],
-            radius=8,
+        """
+        Recompute visible area based on the player POV
+        Only the window within the FOV radius of the player is computed,
+        whatever the size of the map
+        """
+        game_map = self.game_map
+        x, y = self.player.position
+        start = max(0, x - FOV_RADIUS), max(0, y - FOV_RADIUS)
+        end = (
+            min(game_map.width, x + FOV_RADIUS + 1),
+            min(game_map.height, y + FOV_RADIUS + 1),
+        )
+        window = slice(start[0], end[0]), slice(start[1], end[1])
+        visible = compute_fov(
+            game_map.tiles[window]["transparent"],
+            (x - start[0], y - start[1]),
+            radius=FOV_RADIUS,
             algorithm=tcod.FOV_SYMMETRIC_SHADOWCAST,
         )
-        self.game_map.explored |= self.game_map.visible
+        game_map.visible[game_map.fov_window] = False
+        game_map.visible[window] = visible
+        game_map.fov_window = window
+
+        explored = game_map.explored[window]
+        newly_explored = visible & ~explored
+        game_map.explored[window] = explored | visible
+        game_map.state_hash.update_explored(newly_explored, start)
+        game_map.minimap.update_explored(newly_explored, start)
+        game_map.travel_maps.update_explored(newly_explored)
+
+    def render_map(self, console: Console) -> None:
+        """Draw the part of the map around the player"""
+        game_map = self.game_map
+        self.camera.center_on(self.player.position, (game_map.width, game_map.height))
+        game_map.render(console, self.camera)
 
     def render(self, console: Console) -> None:
-        self.game_map.render(console)
-        self.message_log.render(console)
-        render_status(console, self)
+        with tracer.span("map render", "render"):
+            self.render_map(console)
+        with tracer.span("log render", "render"):
+            self.message_log.render(console)
+        with tracer.span("status render", "render"):
+            render_status(console, self)
@@ -5,6 +5,7 @@ from math import sqrt
 from render_order import RenderOrder
 from components.inventory import Inventory
 from components.equipment import Equipment
+from scheduler import BASE_SPEED
 
 if TYPE_CHECKING:
     from game_map import GameMap
@@ -40,14 +41,14 @@ class Entity:
         self.render_order = render_order
         if parent:
             self.parent = parent
-            parent.entities.add(self)
+            parent.add_entity(self)
 
     def spawn(self, game_map: GameMap, position: tuple[int, int]) -> Entity:
         """Spawn a copy of this instance at the given location in the game map"""
         clone = deepcopy(self)
         clone.x, clone.y = position
         clone.parent = game_map
-        game_map.entities.add(clone)
+        game_map.add_entity(clone)
         return clone
 
     def distance_between(self, x: int, y: int) -> float:
@@ -56,12 +57,15 @@ class Entity:
 
     def place(self, position: tuple[int, int], game_map: GameMap | None = None) -> None:
         """Handle moving across new location, i.e. game maps"""
-        self.x, self.y = position
         if game_map:
             if hasattr(self, "parent") and not isinstance(self.parent, Inventory):
-                self.game_map.entities.remove(self)
+                self.game_map.remove_entity(self)
+            self.x, self.y = position
             self.parent = game_map
-            game_map.entities.add(self)
+            game_map.add_entity(self)
+        else:
+            self.x, self.y = position
+            self.game_map.entity_moved(self)
 
     def move(self, dx: int, dy: int) -> None:
         """
@@ -69,6 +73,7 @@ class Entity:
         """
         self.x += dx
         self.y += dy
+        self.game_map.entity_moved(self)
 
     @property
     def info(self) -> tuple[int, int, str, tuple[int, int, int]]:
@@ -97,12 +102,14 @@ class Actor(Entity):
         game_map: GameMap | None = None,
         inventory: Inventory | None = None,
         equipment: Equipment | None = None,
+        speed: int = BASE_SPEED,
     ) -> None:
         super().__init__(
-            name, char, color, position, blocks_movement, game_map, RenderOrder.ACTOR
+            name, char, color, position, blocks_movement, None, RenderOrder.ACTOR
         )
 
         self.ai: BaseAI | None = ai(self)
+        self.speed = speed
 
         self.fighter = fighter
         self.fighter.parent = self
@@ -122,6 +129,10 @@ class Actor(Entity):
         self.equipment = equipment
         self.equipment.parent = self
 
+        if game_map:
+            self.parent = game_map
+            game_map.add_entity(self)
+
     @property
     def is_alive(self) -> bool:
         """Verify if this actor can perform actions"""
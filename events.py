@@ -0,0 +1,98 @@
+"""
+Game events, for observers such as statistics, achievements or telemetry
+
+The game publishes an event at every damage, death, pickup, equip, consumed
+item, floor change and level up. Observers subscribe a callable per event
+type, and the handler of each type is resolved right then: nothing for a type
+nobody listens to, the subscriber itself when alone, a loop over them
+otherwise. Publishing an event without subscribers is a dictionary lookup,
+the event is not even built.
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple, TypeVar
+
+if TYPE_CHECKING:
+    from entity import Actor, Item
+
+
+class Damage(NamedTuple):
+    target: Actor
+    amount: int
+    # Name of whatever dealt the damage, if known
+    source: str | None
+
+
+class Death(NamedTuple):
+    actor: Actor
+    cause: str | None
+
+
+class Pickup(NamedTuple):
+    actor: Actor
+    item: Item
+
+
+class Equip(NamedTuple):
+    actor: Actor
+    item: Item
+    slot: str
+    # False when the item is removed
+    equipped: bool
+
+
+class Consume(NamedTuple):
+    actor: Actor
+    item: Item
+
+
+class FloorChange(NamedTuple):
+    floor: int
+
+
+class LevelUp(NamedTuple):
+    actor: Actor
+    level: int
+
+
+E = TypeVar("E")
+
+
+class EventBus:
+    """Subscribers by event type, with the dispatch of each type resolved"""
+
+    def __init__(self) -> None:
+        self.subscribers: dict[type, list[Callable[[Any], None]]] = {}
+        # Event type -> handler, only for types which have subscribers
+        self.handlers: dict[type, Callable[[Any], None]] = {}
+
+    def subscribe(self, kind: type[E], subscriber: Callable[[E], None]) -> None:
+        self.subscribers.setdefault(kind, []).append(subscriber)
+        self.resolve(kind)
+
+    def unsubscribe(self, kind: type[E], subscriber: Callable[[E], None]) -> None:
+        self.subscribers.get(kind, []).remove(subscriber)
+        self.resolve(kind)
+
+    def resolve(self, kind: type) -> None:
+        subscribers = tuple(self.subscribers.get(kind, ()))
+        if not subscribers:
+            self.handlers.pop(kind, None)
+        elif len(subscribers) == 1:
+            self.handlers[kind] = subscribers[0]
+        else:
+
+            def handler(event: Any) -> None:
+                for subscriber in subscribers:
+                    subscriber(event)
+
+            self.handlers[kind] = handler
+
+    def publish(self, kind: type, *fields: Any) -> None:
+        """Build an event of `kind` from `fields` and hand it to its subscribers"""
+        handler = self.handlers.get(kind)
+        if handler is not None:
+            handler(kind(*fields))
+
+
+events = EventBus()
@@ -7,3 +7,15 @@ class Impossible(Exception):
 
 class QuitWithoutSave(SystemExit):
     """Can be raised to exit the game without automatically saving."""
+
+
+class ReplayDesync(Exception):
+    """Raised when a replay no longer matches the recorded game."""
+
+
+class ReplayVersionError(Exception):
+    """Raised when a replay was recorded by another version of the format."""
+
+
+class ContentError(Exception):
+    """Raised when the content files of the game are not valid."""
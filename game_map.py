@@ -1,14 +1,29 @@
 from __future__ import annotations
-from typing import Iterator, Iterable, TYPE_CHECKING
+from typing import Iterable, TYPE_CHECKING
+from itertools import chain
 from tcod.console import Console
 from entity import Actor, Item
+from activation import ActivationManager
+from scheduler import TurnScheduler
+from spatial import ActorPositions
+from decals import DecalLayer
+from minimap import Minimap
+from travel import TravelMaps
+from state_hash import StateHash
+from tracing import tracer
+from events import FloorChange, events
+from chunked import ChunkedGrid
 import numpy as np
 import tile_types
 
 if TYPE_CHECKING:
+    from camera import Camera
     from entity import Entity
     from engine import Engine
 
+# Maps with more tiles than that are stored in chunks, see `chunked.py`
+CHUNKED_MAP_AREA = 1024 * 1024
+
 
 class GameMap:
     def __init__(
@@ -16,69 +31,157 @@ class GameMap:
     ) -> None:
         self.engine = engine
         self.width, self.height = size
-        self.tiles = np.full(size, fill_value=tile_types.wall, order="F")
-        self.visible = np.full(size, fill_value=False, order="F")
-        self.explored = np.full(size, fill_value=False, order="F")
-        self.entities = set(entities)
+        if self.width * self.height > CHUNKED_MAP_AREA:
+            self.tiles = ChunkedGrid(size, tile_types.tile_dtype, tile_types.wall)
+            self.visible = ChunkedGrid(size, bool, False)
+            self.explored = ChunkedGrid(size, bool, False)
+        else:
+            self.tiles = np.full(size, fill_value=tile_types.wall, order="F")
+            self.visible = np.full(size, fill_value=False, order="F")
+            self.explored = np.full(size, fill_value=False, order="F")
+        # Part of `visible` set by the last field of view computation
+        self.fov_window = slice(0, 0), slice(0, 0)
+        self.entities: set[Entity] = set()
+        self.scheduler = TurnScheduler()
+        self.activation = ActivationManager(self)
+        self.state_hash = StateHash(self)
+        # Living actors are kept by `actor_positions`, the other kinds here,
+        # as dicts so they iterate in the same order on every run
+        self.actor_positions = ActorPositions()
+        self.corpses: dict[Actor, None] = {}
+        self.floor_items: dict[Item, None] = {}
+        self.decals = DecalLayer()
+        self.travel_maps = TravelMaps(self)
+        self.minimap = Minimap(self)
         self.down_stairs_location: tuple[int, int] = (0, 0)
+        for entity in entities:
+            self.add_entity(entity)
 
     @property
     def game_map(self) -> GameMap:
         return self
 
     @property
-    def items(self) -> Iterator[Item]:
-        yield from (entity for entity in self.entities if isinstance(entity, Item))
+    def items(self) -> tuple[Item, ...]:
+        """
+        The items lying on this map
+        A snapshot, so entities can be added or removed while going through it
+        """
+        return tuple(self.floor_items)
 
     @property
-    def actors(self) -> Iterator[Actor]:
-        """Iterate over this map actors"""
-        yield from (
-            entity
-            for entity in self.entities
-            if isinstance(entity, Actor) and entity.is_alive
-        )
+    def actors(self) -> tuple[Actor, ...]:
+        """This map living actors, as a snapshot like `items`"""
+        return tuple(self.actor_positions.actors)
+
+    def add_entity(self, entity: Entity) -> None:
+        """Put an entity on this map, living actors get their turns scheduled"""
+        self.entities.add(entity)
+        self.state_hash.update(entity)
+        if isinstance(entity, Item):
+            self.floor_items[entity] = None
+        elif isinstance(entity, Actor) and entity.is_alive:
+            self.scheduler.add(entity)
+            self.actor_positions.add(entity)
+        elif isinstance(entity, Actor):
+            self.corpses[entity] = None
+
+    def remove_entity(self, entity: Entity) -> None:
+        """Take an entity off this map and off the turn timeline"""
+        self.entities.remove(entity)
+        self.state_hash.remove(entity)
+        if isinstance(entity, Item):
+            self.floor_items.pop(entity, None)
+        elif isinstance(entity, Actor):
+            self.scheduler.remove(entity)
+            self.activation.forget(entity)
+            self.actor_positions.remove(entity)
+            self.corpses.pop(entity, None)
+
+    def add_decal(
+        self,
+        position: tuple[int, int],
+        char: str,
+        color: tuple[int, int, int],
+        label: str,
+    ) -> None:
+        """Leave a mark on the floor, drawn beneath items and actors"""
+        self.decals.add(position, char, color, label)
+        self.state_hash.add_decal(position, label)
+
+    def handle_death(self, actor: Actor) -> None:
+        """A dead actor stays on the map as a corpse, but never acts again"""
+        self.state_hash.update(actor)
+        self.scheduler.remove(actor)
+        self.activation.forget(actor)
+        self.actor_positions.remove(actor)
+        self.corpses[actor] = None
+
+    def entity_moved(self, entity: Entity) -> None:
+        """Called once an entity on this map changed position"""
+        self.state_hash.update(entity)
+        self.actor_positions.update(entity)
 
     def in_bounds(self, x: int, y: int) -> bool:
         """Verify if the x and y are inside of the bounds of this map"""
         return 0 <= x < self.width and 0 <= y < self.height
 
     def get_blocking_entity_at(self, position: tuple[int, int]) -> Entity | None:
-        x, y = position
-        for entity in self.entities:
-            if entity.blocks_movement and entity.x == x and entity.y == y:
-                return entity
+        """Only living actors block movement"""
+        for actor in self.actor_positions.at(position):
+            if actor.blocks_movement:
+                return actor
         return None
 
     def get_actor_at(self, position: tuple[int, int]) -> Actor | None:
-        x, y = position
-        for actor in self.actors:
-            if actor.x == x and actor.y == y:
-                return actor
-        return None
+        actors = self.actor_positions.at(position)
+        return actors[0] if actors else None
+
+    def actors_within(self, position: tuple[int, int], radius: float) -> list[Actor]:
+        """Return the living actors at most `radius` tiles away from `position`"""
+        return self.actor_positions.within(position, radius)
+
+    def actors_in_mask(self, mask: np.ndarray) -> list[Actor]:
+        """Return the living actors standing where `mask` is set"""
+        return self.actor_positions.in_mask(mask)
+
+    def nearest_visible_actor(
+        self, position: tuple[int, int], radius: float, exclude: Actor | None = None
+    ) -> Actor | None:
+        """Return the closest visible living actor within `radius`, but `exclude`"""
+        return self.actor_positions.nearest(position, radius, self.visible, exclude)
 
-    def render(self, console: Console) -> None:
+    def render(self, console: Console, camera: Camera) -> None:
         """
-        Renders the map
+        Renders the part of the map inside the `camera` viewport
 
         In `visible` array tiles are draw with `light` colors,
         In `explored` array tiles are draw with `dark` colors,
         Otherwise the default is `SHROUD`
         """
-        console.tiles_rgb[0 : self.width, 0 : self.height] = np.select(
-            condlist=[self.visible, self.explored],
-            choicelist=[self.tiles["light"], self.tiles["dark"]],
+        map_x, map_y, screen_x, screen_y = camera.window((self.width, self.height))
+        console.tiles_rgb[screen_x, screen_y] = np.select(
+            condlist=[self.visible[map_x, map_y], self.explored[map_x, map_y]],
+            choicelist=[
+                self.tiles["light"][map_x, map_y],
+                self.tiles["dark"][map_x, map_y],
+            ],
             default=tile_types.SHROUD,
         )
-        console.draw_frame(0, 0, 64, 64, clear=False)
-
-        entities_sorted_rendering = sorted(
-            self.entities, key=lambda x: x.render_order.value
+        console.draw_frame(
+            camera.screen_x, camera.screen_y, camera.width, camera.height, clear=False
         )
 
-        for entity in entities_sorted_rendering:
-            if self.visible[entity.position]:
-                console.print(*entity.info)
+        self.decals.render(console, self.visible, camera)
+        actors = self.actor_positions.in_area(
+            (camera.x, camera.y), (camera.x + camera.width, camera.y + camera.height)
+        )
+        # Drawn in `RenderOrder`, without sorting every entity each frame
+        for entity in chain(self.corpses, self.floor_items, actors):
+            if camera.in_view(entity.position) and self.visible[entity.position]:
+                console.print(
+                    *camera.map_to_screen(entity.position), entity.char, entity.color
+                )
 
 
 class GameWorld:
@@ -102,6 +205,8 @@ class GameWorld:
         from generation.dungeon import generate_dungeon
 
         self.current_floor += 1
-        self.engine.game_map = generate_dungeon(
-            self.max_rooms, self.room_limits, self.map_size, self.engine
-        )
+        with tracer.span("floor generation", "generation"):
+            self.engine.game_map = generate_dungeon(
+                self.max_rooms, self.room_limits, self.map_size, self.engine
+            )
+        events.publish(FloorChange, self.current_floor)
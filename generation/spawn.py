@@ -1,56 +1,13 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 from random import choice, choices, randint
-import entity_factory
+from content import registry
 
 if TYPE_CHECKING:
     from entity import Entity
     from game_map import GameMap
     from generation.rooms import Room
 
-max_items_per_floor = [(1, 1), (4, 2)]
-max_enemies_per_floor = [(1, 2), (4, 3), (6, 5)]
-
-items_chances: dict[int, list[tuple[Entity, int]]] = {
-    0: [(entity_factory.lesser_health_potion, 35)],
-    2: [
-        (entity_factory.confusion_scroll, 10),
-        (entity_factory.health_potion, 15),
-        (entity_factory.rust_ring, 5),
-    ],
-    4: [
-        (entity_factory.lightning_scroll, 25),
-        (entity_factory.sword, 5),
-        (entity_factory.health_potion, 35),
-        (entity_factory.jeweled_ring, 5),
-        (entity_factory.leather_cap, 5),
-    ],
-    6: [
-        (entity_factory.fireball_scroll, 25),
-        (entity_factory.leather_armor, 15),
-    ],
-    8: [
-        (entity_factory.axe, 5),
-        (entity_factory.chain_mail, 5),
-        (entity_factory.elden_ring, 5),
-    ],
-    10: [
-        (entity_factory.greater_health_potion, 15),
-        (entity_factory.viking_helmet, 15),
-    ],
-}
-enemies_chances: dict[int, list[tuple[Entity, int]]] = {
-    0: [(entity_factory.orc, 80)],
-    3: [(entity_factory.troll, 15)],
-    5: [(entity_factory.troll, 30), (entity_factory.goblin, 60)],
-    7: [
-        (entity_factory.troll, 60),
-        (entity_factory.goblin, 80),
-        (entity_factory.hobgoblin, 15),
-    ],
-    9: [(entity_factory.golem, 5)],
-}
-
 
 def get_entities_at_random(
     weighted_chances_by_floor: dict[int, list[tuple[Entity, int]]],
@@ -82,11 +39,17 @@ def get_floor_max_value(max_value_list: list[tuple[int, int]], floor: int) -> in
 
 
 def populate_room(dungeon: GameMap, room: Room, floor: int) -> None:
-    number_of_enemies = randint(0, get_floor_max_value(max_enemies_per_floor, floor))
-    number_of_items = randint(0, get_floor_max_value(max_items_per_floor, floor))
+    max_enemies = get_floor_max_value(registry.floor_caps("enemies"), floor)
+    max_items = get_floor_max_value(registry.floor_caps("items"), floor)
+    number_of_enemies = randint(0, max_enemies)
+    number_of_items = randint(0, max_items)
 
-    enemies = get_entities_at_random(enemies_chances, number_of_enemies, floor)
-    items = get_entities_at_random(items_chances, number_of_items, floor)
+    enemies = get_entities_at_random(
+        registry.spawn_chances("enemies"), number_of_enemies, floor
+    )
+    items = get_entities_at_random(
+        registry.spawn_chances("items"), number_of_items, floor
+    )
 
     for entity in enemies + items:
         position = choice(list(room.inner))
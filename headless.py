@@ -0,0 +1,228 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from random import choice
+from time import perf_counter
+from action import Action, BumpAction, ItemAction, PickupAction, WaitAction
+from components.ai import DIRECTIONS, BaseAI
+from components.consumable import HealingConsumable
+from input_handling import MainGameEventHandler, TakeDownStairsAction
+from instrumentation import metrics
+from tracing import tracer
+from replay import recorder
+from project import new_game
+from message_log import MessageCounter, MessageLog, NullMessageLog
+import argparse
+
+if TYPE_CHECKING:
+    from engine import Engine
+    from entity import Actor
+
+
+class BotPolicy(BaseAI):
+    """
+    Scripted player controller for headless runs
+
+    A policy never performs anything by itself, it only returns the next
+    `Action` for the player, which is then handled like a keypress would be.
+    """
+
+    def __init__(self, entity: Actor) -> None:
+        super().__init__(entity)
+        self.path: list[tuple[int, int]] = []
+
+    def next_action(self) -> Action:
+        """Return the action the player should take this turn"""
+        raise NotImplementedError
+
+    def level_up(self) -> None:
+        """Pick an attribute when the player advances a level"""
+        if recorder.enabled:
+            recorder.record_level_up("increase_max_hp")
+        self.entity.level.increase_max_hp()
+
+    def adjacent_enemy(self) -> Actor | None:
+        """Return the living enemy next to the player, the weakest one first"""
+        enemies = [
+            actor
+            for actor in self.engine.game_map.actors_within(self.entity.position, 1.5)
+            if actor is not self.entity
+        ]
+        return min(enemies, key=lambda a: (a.fighter.hp, a.position), default=None)
+
+
+class RandomWalker(BotPolicy):
+    """Bump into a random direction every turn"""
+
+    def next_action(self) -> Action:
+        return BumpAction(self.entity, *choice(DIRECTIONS))
+
+
+class StairsDiver(BotPolicy):
+    """
+    Fight whatever is adjacent, heal when hurt, pick up items on the way
+    and walk straight to the down stairs of every floor.
+    """
+
+    def next_action(self) -> Action:
+        player = self.entity
+        game_map = self.engine.game_map
+
+        enemy = self.adjacent_enemy()
+        if enemy:
+            return BumpAction(player, enemy.x - player.x, enemy.y - player.y)
+
+        if player.fighter.hp <= player.fighter.max_hp // 2:
+            for item in player.inventory.items:
+                if isinstance(item.consumable, HealingConsumable):
+                    return ItemAction(player, item)
+
+        if len(player.inventory.items) < player.inventory.capacity and any(
+            item.position == player.position for item in game_map.items
+        ):
+            return PickupAction(player)
+
+        if player.position == game_map.down_stairs_location:
+            self.path = []
+            return TakeDownStairsAction(player)
+
+        if not self.path or self.path[-1] != game_map.down_stairs_location:
+            self.path = self.get_path_to(game_map.down_stairs_location)
+        if self.path:
+            x, y = self.path.pop(0)
+            return BumpAction(player, x - player.x, y - player.y)
+
+        return WaitAction(player)
+
+
+POLICIES: dict[str, type[BotPolicy]] = {
+    "random": RandomWalker,
+    "diver": StairsDiver,
+}
+
+# Message logs of a headless game: nobody reads the messages, so by default
+# they are only counted, never formatted
+MESSAGE_LOGS: dict[str, type[MessageLog]] = {
+    "count": MessageCounter,
+    "keep": MessageLog,
+    "none": NullMessageLog,
+}
+
+
+class HeadlessResult:
+    """Summary of a single headless game"""
+
+    def __init__(
+        self, engine: Engine, turns: int, rejected: int, elapsed: float
+    ) -> None:
+        self.engine = engine
+        self.turns = turns
+        self.rejected = rejected
+        self.elapsed = elapsed
+
+    @property
+    def floor(self) -> int:
+        return self.engine.game_world.current_floor
+
+    @property
+    def turns_per_second(self) -> float:
+        return self.turns / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict[str, int | float | bool | str | None]:
+        player = self.engine.player
+        return {
+            "turns": self.turns,
+            "rejected": self.rejected,
+            "floor": self.floor,
+            "alive": player.is_alive,
+            "level": player.level.current_level,
+            "xp": player.level.total_xp,
+            "cause_of_death": (
+                None if player.is_alive else player.fighter.last_damage_source
+            ),
+            "elapsed": self.elapsed,
+            "turns_per_second": self.turns_per_second,
+        }
+
+
+def run_game(
+    policy: type[BotPolicy] = StairsDiver,
+    max_turns: int = 1000,
+    max_floors: int | None = None,
+    seed: int | None = None,
+    message_log: type[MessageLog] = MessageCounter,
+) -> HeadlessResult:
+    """
+    Build a game with `new_game` and let `policy` play it without a window
+    The run ends when the player dies, after `max_turns` turns,
+    or once the player reaches floor `max_floors`
+    """
+    engine = new_game(seed)
+    engine.message_log = message_log()
+    handler = MainGameEventHandler(engine)
+    bot = policy(engine.player)
+
+    turns = rejected = 0
+    start = perf_counter()
+    while turns < max_turns and engine.player.is_alive:
+        if max_floors and engine.game_world.current_floor >= max_floors:
+            break
+        if engine.player.level.requires_level_up:
+            bot.level_up()
+
+        if handler.handle_action(bot.next_action()):
+            turns += 1
+            continue
+
+        # The bot asked for something impossible, let the world move on
+        rejected += 1
+        bot.path = []
+        if handler.handle_action(WaitAction(engine.player)):
+            turns += 1
+
+    return HeadlessResult(engine, turns, rejected, perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run Roguelikey without a window.")
+    parser.add_argument("--policy", choices=POLICIES, default="diver")
+    parser.add_argument("--turns", type=int, default=1000, help="turn limit")
+    parser.add_argument("--floors", type=int, help="stop when reaching this floor")
+    parser.add_argument("--seed", type=int, help="random seed")
+    parser.add_argument("--metrics", help="write per-phase timings to this file")
+    parser.add_argument("--trace", help="write a Chrome trace to this file")
+    parser.add_argument("--record", help="write a replay of the game to this file")
+    parser.add_argument(
+        "--messages", choices=MESSAGE_LOGS, default="count", help="message log kind"
+    )
+    args = parser.parse_args()
+
+    metrics.enabled = bool(args.metrics)
+    tracer.enabled = bool(args.trace)
+    recorder.enabled = bool(args.record)
+    result = run_game(
+        POLICIES[args.policy],
+        args.turns,
+        args.floors,
+        args.seed,
+        MESSAGE_LOGS[args.messages],
+    )
+    if args.metrics:
+        metrics.dump(args.metrics)
+    if args.trace:
+        tracer.export(args.trace)
+    if args.record:
+        recorder.save(args.record)
+
+    print(f"policy: {args.policy}")
+    print(f"turns: {result.turns} ({result.rejected} rejected actions)")
+    print(f"floor: {result.floor}")
+    print(f"player alive: {result.engine.player.is_alive}")
+    print(f"elapsed: {result.elapsed:.3f}s")
+    print(f"turns per second: {result.turns_per_second:.1f}")
+    message_log = result.engine.message_log
+    if isinstance(message_log, MessageCounter):
+        print(f"messages: {message_log.by_category()}")
+
+
+if __name__ == "__main__":
+    main()
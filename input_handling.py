@@ -5,6 +5,9 @@ from typing import TYPE_CHECKING, Callable, Union
 from action import Action, DropAction, BumpAction, EquipAction, WaitAction, PickupAction
 from tcod.console import Console
 from exception import Impossible, QuitWithoutSave
+from instrumentation import metrics
+from tracing import tracer
+from replay import encode_action, recorder
 import tcod.constants
 import tcod.event
 import color
@@ -94,7 +97,24 @@ class PopupMessage(BaseEventHandler):
         return self.parent
 
 
-class HelpDialog(PopupMessage):
+class TextDialog(PopupMessage):
+    """Display a page of text over the dimmed parent, from its top left."""
+
+    def on_render(self, console: Console) -> None:
+        self.parent.on_render(console)
+        console.tiles_rgb["fg"] //= 8
+        console.tiles_rgb["bg"] //= 8
+
+        console.print(
+            console.width // 4,
+            console.height // 8,
+            self.text,
+            fg=color.white,
+            bg=color.black,
+        )
+
+
+class HelpDialog(TextDialog):
     def __init__(self, parent: BaseEventHandler) -> None:
         text = "\n".join(
             [
@@ -108,6 +128,8 @@ class HelpDialog(PopupMessage):
                 "[u] to go upright direction",
                 "[n] to go downright direction",
                 "[w] wait a turn",
+                "[x] explore until something shows up",
+                "[t] travel to the stairs",
                 "\n\n# Game",
                 "[i] open inventory",
                 "[v] show history logs",
@@ -126,18 +148,15 @@ class HelpDialog(PopupMessage):
         )
         super().__init__(parent, text)
 
-    def on_render(self, console: Console) -> None:
-        self.parent.on_render(console)
-        console.tiles_rgb["fg"] //= 8
-        console.tiles_rgb["bg"] //= 8
 
-        console.print(
-            console.width // 4,
-            console.height // 8,
-            self.text,
-            fg=color.white,
-            bg=color.black,
-        )
+class MemoryReportDialog(TextDialog):
+    """Display how much memory each part of the running game holds."""
+
+    def __init__(self, parent: EventHandler) -> None:
+        from memory import memory_report
+
+        lines = memory_report(parent.engine).lines()
+        super().__init__(parent, "\n".join(["# Memory Report", "", *lines]))
 
 
 class EventHandler(BaseEventHandler):
@@ -150,25 +169,41 @@ class EventHandler(BaseEventHandler):
         if isinstance(action_or_state, BaseEventHandler):
             return action_or_state
         elif self.handle_action(action_or_state):
-            if not self.engine.player.is_alive:
-                return GameOverEventHandler(self)
-            elif self.engine.player.level.requires_level_up:
-                return LevelUpEventHandler(self.engine)
-            return MainGameEventHandler(self.engine)
+            return self.after_turn()
         return self
 
+    def after_turn(self) -> BaseEventHandler:
+        """Return the handler to switch to once the player took a turn"""
+        if not self.engine.player.is_alive:
+            return GameOverEventHandler(self)
+        elif self.engine.player.level.requires_level_up:
+            return LevelUpEventHandler(self.engine)
+        return MainGameEventHandler(self.engine)
+
     def handle_action(self, action: Action | None) -> bool:
         if action is None:
             return False
 
+        if recorder.enabled:
+            # Items are recorded by inventory index, which using them can change
+            record = encode_action(action)
+        origin = self.engine.game_map, self.engine.player.position
+        span = tracer.span(type(action).__name__, "action")
         try:
-            action.perform()
+            with metrics.phase("action.perform"), span:
+                action.perform()
         except Impossible as exc:
             self.engine.message_log.add_message(exc.args[0], color.impossible)
             return False
 
-        self.engine.handle_enemy_turn()
-        self.engine.update_fov()
+        with metrics.phase("enemy_turn"), tracer.span("enemy turn", "ai"):
+            self.engine.handle_enemy_turn(action.cost)
+        # Nothing changes what the player sees but the player moving
+        if origin != (self.engine.game_map, self.engine.player.position):
+            with metrics.phase("update_fov"), tracer.span("fov", "fov"):
+                self.engine.update_fov()
+        if recorder.enabled:
+            recorder.record_action(record, self.engine)
         return True
 
     def on_render(self, console: Console) -> None:
@@ -177,8 +212,8 @@ class EventHandler(BaseEventHandler):
     def ev_mousemotion(
         self, event: tcod.event.MouseMotion
     ) -> Action | BaseEventHandler | None:
-        position = (event.tile.x, event.tile.y)
-        if self.engine.game_map.in_bounds(*position):
+        position = self.engine.camera.screen_to_map((event.tile.x, event.tile.y))
+        if position and self.engine.game_map.in_bounds(*position):
             self.engine.is_mouse_motion = True
             self.engine.mouse_location = position
 
@@ -196,6 +231,16 @@ class MainGameEventHandler(EventHandler):
                 return WaitAction(player)
             case tcod.event.K_g:
                 return PickupAction(player)
+            case tcod.event.K_x:
+                from travel import TravelMaps, travel
+
+                if travel(self, TravelMaps.explore, "Nothing left to explore."):
+                    return self.after_turn()
+            case tcod.event.K_t:
+                from travel import TravelMaps, travel
+
+                if travel(self, TravelMaps.stairs, "You know no way to the stairs."):
+                    return self.after_turn()
             case tcod.event.K_v:
                 return HistoryViewer(self.engine)
             case tcod.event.K_i:
@@ -402,9 +447,15 @@ class InGameMenu(AskUserEventHandler, PopupMessage):
         self.engine = parent.engine
         self.cursor = 0
 
-        self.elements = ["Help", "Save and Quit", "Quit without saving"]
+        self.elements = [
+            "Help",
+            "Memory Report",
+            "Save and Quit",
+            "Quit without saving",
+        ]
         self.functions = [
             lambda: HelpDialog(self.parent),
+            lambda: MemoryReportDialog(self.parent),
             lambda: (_ for _ in ()).throw(SystemExit),
             lambda: (_ for _ in ()).throw(QuitWithoutSave),
         ]
@@ -488,6 +539,8 @@ class LevelUpEventHandler(AskUserEventHandler):
         self.cursor_move(event, len(self.options))
         if event.sym != CONFIRM_KEY:
             return
+        if recorder.enabled:
+            recorder.record_level_up(self.functions[self.cursor].__name__)
         self.functions[self.cursor]()
 
         return super().ev_keydown(event)
@@ -587,9 +640,11 @@ class SelectIndexHandler(AskUserEventHandler):
     def on_render(self, console: Console) -> None:
         """Highlight the tile under the cursor."""
         super().on_render(console)
-        position = self.engine.mouse_location
-        console.tiles_rgb["bg"][position] = color.white
-        console.tiles_rgb["fg"][position] = color.black
+        camera = self.engine.camera
+        if camera.in_view(self.engine.mouse_location):
+            position = camera.map_to_screen(self.engine.mouse_location)
+            console.tiles_rgb["bg"][position] = color.white
+            console.tiles_rgb["fg"][position] = color.black
 
     def ev_keydown(self, event: tcod.event.KeyDown) -> Action | BaseEventHandler | None:
         """Check for movement or confirmation."""
@@ -622,9 +677,10 @@ class SelectIndexHandler(AskUserEventHandler):
         self, event: tcod.event.MouseButtonDown
     ) -> Action | BaseEventHandler | None:
         """Left click confirms a selection."""
-        if self.engine.game_map.in_bounds(*event.tile):
+        position = self.engine.camera.screen_to_map((event.tile.x, event.tile.y))
+        if position and self.engine.game_map.in_bounds(*position):
             if event.button == 1:
-                return self.on_index_selected(*event.tile)
+                return self.on_index_selected(*position)
         return super().ev_mousebuttondown(event)
 
     def on_index_selected(self, x: int, y: int) -> Action | BaseEventHandler | None:
@@ -672,7 +728,7 @@ class AreaRangedAttackHandler(SelectIndexHandler):
         """Highlight area under the cursor."""
         super().on_render(console)
 
-        x, y = self.engine.mouse_location
+        x, y = self.engine.camera.map_to_screen(self.engine.mouse_location)
         x = x - self.radius - 1
         y = y - self.radius - 1
         width = self.radius**2
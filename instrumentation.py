@@ -0,0 +1,170 @@
+"""
+Lightweight timing of the game loop phases
+
+Instrumented code asks `metrics.enabled` (or uses `metrics.phase`) before
+reading the clock, so nothing is measured unless it was switched on, either
+from code or with the `ROGUELIKEY_METRICS=<file>` environment variable.
+"""
+
+from __future__ import annotations
+from bisect import bisect_left
+from collections import deque
+from contextlib import nullcontext
+from time import perf_counter
+from typing import Callable, ContextManager
+import json
+
+# Upper bounds of the histogram buckets, in seconds
+BUCKETS = [scale * 10.0**exponent for exponent in range(-6, 1) for scale in (1, 2, 5)]
+# Amount of recent samples kept for the rolling statistics
+WINDOW = 256
+
+# Returned instead of a timer while disabled, entering it does nothing
+NULL_CONTEXT = nullcontext()
+
+
+class PhaseStats:
+    """Counters, a latency histogram and a rolling window of one phase"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.histogram = [0] * (len(BUCKETS) + 1)
+        self.recent: deque[float] = deque(maxlen=WINDOW)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+        self.histogram[bisect_left(BUCKETS, seconds)] += 1
+        self.recent.append(seconds)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def recent_mean(self) -> float:
+        return sum(self.recent) / len(self.recent) if self.recent else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Return the `q` percentile (0 to 100) of the recent samples"""
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "max": self.maximum,
+            "recent_mean": self.recent_mean,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "histogram": {
+                (f"<={bound:g}" if i < len(BUCKETS) else f">{BUCKETS[-1]:g}"): n
+                for i, (bound, n) in enumerate(
+                    zip(BUCKETS + [float("inf")], self.histogram)
+                )
+                if n
+            },
+        }
+
+
+class BlockTimer:
+    """Context manager handing the `perf_counter` bounds of its block to `record`"""
+
+    def __init__(self, record: Callable[[float, float], None]) -> None:
+        self.record = record
+
+    def __enter__(self) -> None:
+        self.start = perf_counter()
+
+    def __exit__(self, *_) -> None:
+        self.record(self.start, perf_counter())
+
+
+class Metrics:
+    """Registry of every instrumented phase"""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.phases: dict[str, PhaseStats] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add a single measurement of the phase `name`"""
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats()
+        stats.add(seconds)
+
+    def phase(self, name: str) -> ContextManager[None]:
+        """Time the enclosed block as the phase `name`, when enabled"""
+        if not self.enabled:
+            return NULL_CONTEXT
+        return BlockTimer(lambda start, end: self.record(name, end - start))
+
+    def get(self, name: str) -> PhaseStats | None:
+        return self.phases.get(name)
+
+    def reset(self) -> None:
+        self.phases.clear()
+
+    def summary(self) -> dict[str, dict]:
+        """Return the statistics of every phase, sorted by name"""
+        return {name: self.phases[name].as_dict() for name in sorted(self.phases)}
+
+    def dump(self, filename: str) -> None:
+        """Write the summary as JSON"""
+        with open(filename, "w") as file:
+            json.dump(self.summary(), file, indent=2)
+
+
+class InputLatency:
+    """
+    Time elapsed from dispatching an input event to presenting the next frame
+
+    Latencies are recorded into `metrics` as `input_latency.<Handler>` phases,
+    grouped by the type of the handler which received the event.
+    """
+
+    prefix = "input_latency."
+
+    def __init__(self, metrics: Metrics) -> None:
+        self.metrics = metrics
+        self.enabled = False
+        self.pending: list[tuple[str, float]] = []
+
+    def dispatched(self, handler: object) -> None:
+        """Timestamp an event about to be dispatched to `handler`"""
+        if self.enabled:
+            self.pending.append((type(handler).__name__, perf_counter()))
+
+    def presented(self) -> None:
+        """Close every pending event once its frame is on screen"""
+        if not self.pending:
+            return
+        now = perf_counter()
+        for name, start in self.pending:
+            self.metrics.record(self.prefix + name, now - start)
+        self.pending.clear()
+
+    def percentiles(self) -> dict[str, tuple[float, float, float]]:
+        """Return p50, p95 and p99 latencies in seconds, per handler type"""
+        return {
+            name[len(self.prefix) :]: (
+                stats.percentile(50),
+                stats.percentile(95),
+                stats.percentile(99),
+            )
+            for name, stats in sorted(self.metrics.phases.items())
+            if name.startswith(self.prefix)
+        }
+
+
+metrics = Metrics()
+input_latency = InputLatency(metrics)
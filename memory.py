@@ -0,0 +1,147 @@
+"""
+Memory accounting of a running game
+
+`memory_report` walks an `Engine` and attributes the bytes it holds to the map
+arrays, the entities (grouped by class and name), the message log and the
+remaining state. `AllocationTracker` diffs `tracemalloc` snapshots between two
+points of a run, to find what keeps growing.
+"""
+
+from __future__ import annotations
+from collections import deque
+from enum import Enum
+from types import FunctionType, MethodType, ModuleType
+from typing import TYPE_CHECKING, Iterable
+import sys
+import tracemalloc
+import numpy as np
+
+if TYPE_CHECKING:
+    from engine import Engine
+
+
+def deep_sizeof(obj: object, seen: set[int]) -> int:
+    """
+    Return the size in bytes of `obj` and everything it references
+    Objects whose id is in `seen` are skipped, and added once visited
+    """
+    if id(obj) in seen or isinstance(
+        obj, (type, ModuleType, FunctionType, MethodType, Enum)
+    ):
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj) + (0 if obj.flags.owndata else obj.nbytes)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    if hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class MemoryReport:
+    """Bytes held by each part of the engine, as (label, count, bytes) rows"""
+
+    def __init__(self, sections: list[tuple[str, int, int]]) -> None:
+        self.sections = sections
+
+    @property
+    def total(self) -> int:
+        return sum(size for _, _, size in self.sections)
+
+    def as_dict(self) -> dict[str, dict[str, int]]:
+        return {
+            label: {"count": count, "bytes": size}
+            for label, count, size in self.sections
+        }
+
+    def lines(self, width: int = 48) -> Iterable[str]:
+        """Yield the report as aligned text lines"""
+        rows = [(label, count, size) for label, count, size in self.sections]
+        rows.append(("Total", 1, self.total))
+        for label, count, size in rows:
+            if count > 1:
+                label += f" (x{count})"
+            size_text = format_bytes(size)
+            room = width - len(size_text) - 1
+            yield f"{label[:room]:<{room}} {size_text}"
+
+
+def memory_report(engine: Engine) -> MemoryReport:
+    """Walk the engine and attribute the memory it holds to its subsystems"""
+    game_map = engine.game_map
+    # Shared owners are never charged to whatever references them
+    seen = {id(engine), id(game_map)}
+    sections: list[tuple[str, int, int]] = []
+
+    for name in ("tiles", "visible", "explored"):
+        array = getattr(game_map, name)
+        sections.append((f"GameMap.{name}", 1, deep_sizeof(array, seen)))
+
+    groups: dict[str, list[int]] = {}
+    entities = sorted(game_map.entities, key=lambda e: (type(e).__name__, e.name))
+    for entity in entities:
+        group = groups.setdefault(f"{type(entity).__name__}: {entity.name}", [0, 0])
+        group[0] += 1
+        group[1] += deep_sizeof(entity, seen)
+    sections.extend(
+        sorted(
+            ((label, count, size) for label, (count, size) in groups.items()),
+            key=lambda section: -section[2],
+        )
+    )
+
+    decals = game_map.decals
+    sections.append(("GameMap.decals", len(decals), deep_sizeof(decals, seen)))
+
+    messages = engine.message_log.messages
+    sections.append(
+        ("MessageLog.messages", len(messages), deep_sizeof(engine.message_log, seen))
+    )
+
+    other = vars(game_map).copy()
+    for name in ("tiles", "visible", "explored", "entities", "decals", "engine"):
+        other.pop(name, None)
+    sections.append(("GameMap (other)", 1, deep_sizeof(other, seen)))
+    sections.append(("GameWorld", 1, deep_sizeof(engine.game_world, seen)))
+    sections.append(("Engine (other)", 1, deep_sizeof(vars(engine), seen)))
+    return MemoryReport(sections)
+
+
+class AllocationTracker:
+    """Compare `tracemalloc` snapshots taken at two points of a run"""
+
+    def __init__(self, frames: int = 1) -> None:
+        self.frames = frames
+        self.snapshot: tracemalloc.Snapshot | None = None
+
+    def start(self) -> None:
+        """Start tracing if needed and remember the current allocations"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self.snapshot = tracemalloc.take_snapshot()
+
+    def diff(self, limit: int = 10) -> list[tracemalloc.StatisticDiff]:
+        """Return the allocation sites which grew the most since `start`"""
+        if self.snapshot is None:
+            raise RuntimeError("AllocationTracker.start was never called")
+        current = tracemalloc.take_snapshot()
+        stats = current.compare_to(self.snapshot, "lineno")
+        return stats[:limit]
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self.snapshot = None
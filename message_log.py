@@ -1,45 +1,130 @@
-from typing import Reversible, Iterable
-from tcod import Console
+"""
+Messages of the game, kept as records and only formatted when read
+
+A message is a template ID and the arguments filling it, the text is built the
+first time it is rendered or exported. Runs nobody watches can swap the log
+for `MessageCounter` or `NullMessageLog`, which never build any text.
+"""
+
+from __future__ import annotations
+from collections import Counter
+from typing import Any, Reversible, Iterable
+from tcod.console import Console
 from textwrap import wrap
 
 import tcod
 import color
 
+# Template ID -> (text, category)
+TEMPLATES: dict[str, tuple[str, str]] = {
+    "text": ("{text}", "info"),
+    "attack": ("{attacker} attacks {target} for {damage} hit points.", "combat"),
+    "attack.critical": (
+        "{attacker} attacks {target} giving a CRITICAL strike for {damage} hit points.",
+        "combat",
+    ),
+    "attack.no_damage": ("{attacker} attacks {target} but does no damage.", "combat"),
+    "attack.critical.no_damage": (
+        "{attacker} attacks {target} giving a CRITICAL strike but does no damage.",
+        "combat",
+    ),
+    "death": ("{name} is dead!", "combat"),
+    "lightning": (
+        "A lightning bolt strikes the {target} with loud thunder, for {damage} damage!",
+        "combat",
+    ),
+    "fireball": (
+        "The {target} is engulfed in a fiery explosion, taking {damage} damage!",
+        "combat",
+    ),
+    "confusion": (
+        "The {target} eyes look vacant, as it starts to stumble around!",
+        "combat",
+    ),
+    "confusion.end": ("The {target} is no longer confused.", "combat"),
+    "heal": ("You consume {item} and recover {amount} HP!", "item"),
+    "pickup": ("You picked up the {item}", "item"),
+    "drop": ("You dropped the {item}.", "item"),
+    "equip": ("You equip the {item}.", "item"),
+    "unequip": ("You remove the {item}.", "item"),
+    "xp": ("You gain {xp} experience points.", "progress"),
+    "level_up": ("You advance to level {level}!", "progress"),
+}
+
 
 class Message:
-    def __init__(self, text: str, fg: tuple[int, int, int]) -> None:
-        self.plain_text = text
+    def __init__(
+        self, template: str, arguments: dict[str, Any], fg: tuple[int, int, int]
+    ) -> None:
+        self.template = template
+        self.arguments = arguments
         self.fg = fg
         self.count = 1
+        self._text: str | None = None
+
+    @property
+    def category(self) -> str:
+        return TEMPLATES[self.template][1]
+
+    @property
+    def plain_text(self) -> str:
+        """The text of this message, formatted on first use"""
+        if self._text is None:
+            self._text = TEMPLATES[self.template][0].format(**self.arguments)
+        return self._text
 
     @property
     def full_text(self) -> str:
         """The full text of this message, including count if necessary"""
         return self.plain_text + f" (x{self.count})" * (self.count != 1)
 
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "template": self.template,
+            "category": self.category,
+            "arguments": self.arguments,
+            "count": self.count,
+            "text": self.plain_text,
+        }
+
 
 class MessageLog:
     def __init__(self) -> None:
         self.messages: list[Message] = []
 
-    def add_message(
-        self, text: str, fg: tuple[int, int, int] = color.white, *, stack: bool = True
+    def add(
+        self,
+        template: str,
+        fg: tuple[int, int, int] = color.white,
+        *,
+        stack: bool = True,
+        **arguments: Any,
     ) -> None:
         """
-        Add message to this log
-        `text` is the plain text
+        Add a message built from `template` and its `arguments` to this log
         `fg` is the text color
         If `stack` is True, then message can stack with previous ones
         """
-        if stack and self.messages and text == self.messages[-1].plain_text:
+        if (
+            stack
+            and self.messages
+            and template == self.messages[-1].template
+            and arguments == self.messages[-1].arguments
+        ):
             self.messages[-1].count += 1
         else:
-            self.messages.append(Message(text, fg))
+            self.messages.append(Message(template, arguments, fg))
+
+    def add_message(
+        self, text: str, fg: tuple[int, int, int] = color.white, *, stack: bool = True
+    ) -> None:
+        """Add a message of plain text to this log"""
+        self.add("text", fg, stack=stack, text=text)
 
     def render(self, console: Console) -> None:
         """Render this log over the given area"""
-        position = 64, 40
-        size = 32, 24
+        position = 64, 48
+        size = 32, 16
         console.draw_frame(*position, *size)
         console.print_box(*position, size[0], 1, "┤ Logs ├", alignment=tcod.CENTER)
         self.render_messages(console, position, size, self.messages)
@@ -78,3 +163,41 @@ class MessageLog:
                 y_offset += 1
                 if y_offset >= h:
                     return
+
+
+class MessageCounter(MessageLog):
+    """Log counting messages by template, without keeping or formatting them"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.counts: Counter[str] = Counter()
+
+    def add(
+        self,
+        template: str,
+        fg: tuple[int, int, int] = color.white,
+        *,
+        stack: bool = True,
+        **arguments: Any,
+    ) -> None:
+        self.counts[template] += 1
+
+    def by_category(self) -> dict[str, int]:
+        categories: Counter[str] = Counter()
+        for template, count in self.counts.items():
+            categories[TEMPLATES[template][1]] += count
+        return dict(categories)
+
+
+class NullMessageLog(MessageLog):
+    """Log dropping every message"""
+
+    def add(
+        self,
+        template: str,
+        fg: tuple[int, int, int] = color.white,
+        *,
+        stack: bool = True,
+        **arguments: Any,
+    ) -> None:
+        pass
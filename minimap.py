@@ -0,0 +1,110 @@
+"""
+Overview of a whole map, drawn in the side panel
+
+Every cell of the minimap stands for a square block of tiles, reduced with
+NumPy reshapes to whether any of it is explored, and whether any explored tile
+of it is walkable. Blocks are only reduced again once marked as changed, which
+the field of view does for the tiles it explores, so a frame usually costs
+nothing but drawing. Entities are few and placed again on every frame.
+"""
+
+from __future__ import annotations
+from math import ceil
+from typing import TYPE_CHECKING
+import numpy as np
+import color
+
+if TYPE_CHECKING:
+    from tcod.console import Console
+    from game_map import GameMap
+
+# Frame of the minimap in the side panel, the minimap fits inside it
+MINIMAP_FRAME = 32, 18
+MINIMAP_SIZE = MINIMAP_FRAME[0] - 2, MINIMAP_FRAME[1] - 2
+
+UNKNOWN, WALL, FLOOR = range(3)
+
+
+def reduce_blocks(mask: np.ndarray, block: int) -> np.ndarray:
+    """Return whether any tile of each `block` by `block` square of `mask` is set"""
+    width, height = mask.shape
+    mask = np.pad(mask, ((0, -width % block), (0, -height % block)))
+    blocks = mask.reshape(mask.shape[0] // block, block, mask.shape[1] // block, block)
+    return blocks.any(axis=(1, 3))
+
+
+class Minimap:
+    """Downsampled view of a map, kept up to date block by block"""
+
+    def __init__(self, game_map: GameMap, size: tuple[int, int] = MINIMAP_SIZE) -> None:
+        self.game_map = game_map
+        self.block = max(
+            ceil(game_map.width / size[0]), ceil(game_map.height / size[1]), 1
+        )
+        shape = ceil(game_map.width / self.block), ceil(game_map.height / self.block)
+        self.cells = np.full(shape, UNKNOWN, dtype=np.int8, order="F")
+        self.dirty = np.ones(shape, dtype=bool, order="F")
+
+    def to_cell(self, position: tuple[int, int]) -> tuple[int, int]:
+        return position[0] // self.block, position[1] // self.block
+
+    def update_explored(
+        self, changed: np.ndarray, offset: tuple[int, int] = (0, 0)
+    ) -> None:
+        """
+        Mark the blocks where `changed` is set as changed
+        `changed` covers the part of the map starting at `offset`
+        """
+        xs, ys = np.nonzero(changed)
+        self.dirty[(xs + offset[0]) // self.block, (ys + offset[1]) // self.block] = 1
+
+    def refresh(self) -> None:
+        """Reduce again the blocks changed since the last refresh"""
+        if not self.dirty.any():
+            return
+        xs, ys = np.nonzero(self.dirty)
+        start = int(xs.min()), int(ys.min())
+        end = int(xs.max()) + 1, int(ys.max()) + 1
+        block, game_map = self.block, self.game_map
+        window = (
+            slice(start[0] * block, min(game_map.width, end[0] * block)),
+            slice(start[1] * block, min(game_map.height, end[1] * block)),
+        )
+        explored = np.asarray(game_map.explored[window])
+        walkable = np.asarray(game_map.tiles[window]["walkable"])
+        self.cells[start[0] : end[0], start[1] : end[1]] = np.select(
+            [reduce_blocks(walkable & explored, block), reduce_blocks(explored, block)],
+            [FLOOR, WALL],
+            UNKNOWN,
+        )
+        self.dirty[:] = False
+
+    def render(self, console: Console, location: tuple[int, int]) -> None:
+        """Draw the minimap with its top left cell at `location`"""
+        self.refresh()
+        game_map = self.game_map
+        x, y = location
+        width, height = self.cells.shape
+        tiles = console.tiles_rgb[x : x + width, y : y + height]
+        tiles["ch"] = ord(" ")
+        tiles["bg"] = np.select(
+            [(self.cells == FLOOR)[..., None], (self.cells == WALL)[..., None]],
+            [color.minimap_floor, color.minimap_wall],
+            color.black,
+        )
+
+        stairs = game_map.down_stairs_location
+        if game_map.explored[stairs]:
+            console.print(*self.place(location, stairs), ">", fg=color.white)
+        for actor in game_map.actors_in_mask(game_map.visible):
+            if actor is not game_map.engine.player:
+                console.print(*self.place(location, actor.position), "•", fg=color.red)
+        player = game_map.engine.player
+        console.print(*self.place(location, player.position), "@", fg=color.white)
+
+    def place(
+        self, location: tuple[int, int], position: tuple[int, int]
+    ) -> tuple[int, int]:
+        """Return the console position of the cell of a map position"""
+        cx, cy = self.to_cell(position)
+        return location[0] + cx, location[1] + cy
@@ -2,9 +2,12 @@ from __future__ import annotations
 from input_handling import BaseEventHandler, EventHandler
 from exception import QuitWithoutSave
 from copy import deepcopy
+from typing import TYPE_CHECKING, Iterable
 from tcod.console import Console
-from engine import Engine
-from game_map import GameWorld
+from instrumentation import input_latency, metrics
+from tracing import tracer
+from replay import recorder
+from render_functions import render_latency_overlay
 from input_handling import (
     CONFIRM_KEY,
     CURSOR_Y_KEYS,
@@ -19,21 +22,68 @@ import tcod.console
 import color
 import traceback
 import os
-import entity_factory
 import color
 import tcod
 import lzma
 import pickle
+import random
+
+if TYPE_CHECKING:
+    from engine import Engine
 
 
 # Screen Size
 screen_size = 96, 64
+# Map Size, the view scrolls over maps larger than the screen
+map_size = 64, 64
 # Save file name
 save_file_name = "data.sav"
+# When set, phase timings are collected and written to this file on exit
+metrics_file_name = os.environ.get("ROGUELIKEY_METRICS")
+# When set, game loop spans are traced and exported to this file on exit
+trace_file_name = os.environ.get("ROGUELIKEY_TRACE")
+# Show the input latency overlay from start, it can be toggled with F3 anyway
+latency_overlay = bool(os.environ.get("ROGUELIKEY_LATENCY_OVERLAY"))
+# When set, new games are recorded and written to this file on exit
+replay_file_name = os.environ.get("ROGUELIKEY_REPLAY")
+# Events timed from dispatch to present
+latency_events = (tcod.event.KeyDown, tcod.event.MouseButtonDown)
+# Key repeats handled between two frames, extra ones are dropped
+max_key_repeats = 2
+
+
+def coalesce_events(events: Iterable[tcod.event.Event]) -> list[tcod.event.Event]:
+    """
+    Trim a batch of queued events before handling it
+    Only the last mouse motion is kept, where it was among the other events,
+    and at most `max_key_repeats` key repeats, so holding a key down can
+    never queue more work than a frame
+    """
+    coalesced: list[tcod.event.Event] = []
+    motion = None
+    motion_index = 0
+    repeats = 0
+    for event in events:
+        if isinstance(event, tcod.event.MouseMotion):
+            motion, motion_index = event, len(coalesced)
+            continue
+        if isinstance(event, tcod.event.KeyDown) and event.repeat:
+            repeats += 1
+            if repeats > max_key_repeats:
+                continue
+        coalesced.append(event)
+    if motion is not None:
+        coalesced.insert(motion_index, motion)
+    return coalesced
 
 
 def main() -> None:
     handler: BaseEventHandler = MainMenu()
+    metrics.enabled = bool(metrics_file_name)
+    tracer.enabled = bool(trace_file_name)
+    recorder.enabled = bool(replay_file_name)
+    show_overlay = latency_overlay
+    input_latency.enabled = metrics.enabled or show_overlay
 
     # https://dwarffortresswiki.org/index.php/Tileset_repository#Zilk_16x16.png
     tileset = tcod.tileset.load_tilesheet(
@@ -52,12 +102,38 @@ def main() -> None:
         try:
             while True:
                 root_console.clear()
-                handler.on_render(root_console)
-                context.present(root_console, keep_aspect=True, integer_scaling=True)
+                with metrics.phase("on_render"):
+                    handler.on_render(root_console)
+                if show_overlay:
+                    render_latency_overlay(root_console, input_latency, (2, 2))
+                with metrics.phase("present"):
+                    context.present(
+                        root_console, keep_aspect=True, integer_scaling=True
+                    )
+                input_latency.presented()
                 try:
-                    for event in tcod.event.wait():
+                    held_in = type(handler)
+                    for event in coalesce_events(tcod.event.wait()):
+                        # Repeats were meant for the kind of handler the key
+                        # was held in, not for a dialog that just opened
+                        if (
+                            type(handler) is not held_in
+                            and isinstance(event, tcod.event.KeyDown)
+                            and event.repeat
+                        ):
+                            continue
                         context.convert_event(event)
-                        handler = handler.handle_events(event)
+                        if (
+                            isinstance(event, tcod.event.KeyDown)
+                            and event.sym == tcod.event.K_F3
+                        ):
+                            show_overlay = not show_overlay
+                            input_latency.enabled = metrics.enabled or show_overlay
+                            continue
+                        if isinstance(event, latency_events):
+                            input_latency.dispatched(handler)
+                        with tracer.span(type(event).__name__, "input"):
+                            handler = handler.handle_events(event)
                 except Exception:
                     traceback.print_exc()
                     if isinstance(handler, EventHandler):
@@ -69,11 +145,26 @@ def main() -> None:
         except (SystemExit, BaseException):
             save_game(handler, save_file_name)
             raise
+        finally:
+            if metrics_file_name:
+                metrics.dump(metrics_file_name)
+            if trace_file_name:
+                tracer.export(trace_file_name)
+            if replay_file_name:
+                recorder.save(replay_file_name)
 
 
-def new_game() -> Engine:
-    """Return a brand new game as an Engine instance."""
-    map_size = screen_size[0] - 32, screen_size[1]
+def new_game(seed: int | None = None) -> Engine:
+    """Return a brand new game as an Engine instance, built from `seed` if given."""
+    # Only needed once a game starts, not to show the main menu
+    from engine import Engine
+    from game_map import GameWorld
+    import entity_factory
+
+    if recorder.enabled:
+        seed = recorder.start(seed)
+    if seed is not None:
+        random.seed(seed)
     room_limits = 8, 12
     max_rooms = 30
 
@@ -120,6 +211,8 @@ def save_game(handler: BaseEventHandler, filename: str) -> None:
 
 def load_game(filename: str) -> Engine:
     """Load an Engine instance from file."""
+    from engine import Engine
+
     with open(filename, "rb") as file:
         engine = pickle.loads(lzma.decompress(file.read()))
     assert isinstance(engine, Engine)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
+from itertools import chain
+from minimap import MINIMAP_FRAME, MINIMAP_SIZE
 import color
 import tcod
 
@@ -7,17 +9,23 @@ if TYPE_CHECKING:
     from tcod import Console
     from game_map import GameMap
     from engine import Engine
+    from instrumentation import InputLatency
 
 
 def get_names_at(position: tuple[int, int], game_map: GameMap) -> str:
     if not game_map.in_bounds(*position) or not game_map.visible[position]:
         return ""
 
-    entities = set(game_map.entities)
+    entities = game_map.actor_positions.at(position) + [
+        entity
+        for entity in chain(game_map.floor_items, game_map.corpses)
+        if entity.position == position
+    ]
     if not game_map.engine.is_mouse_motion:
-        entities -= {game_map.engine.player}
+        entities = [e for e in entities if e is not game_map.engine.player]
 
-    names = [entity.name for entity in entities if entity.position == position]
+    names = [entity.name for entity in entities]
+    names += game_map.decals.labels_at(position)
 
     if position == game_map.down_stairs_location:
         names.insert(0, "Down Stairs")
@@ -57,6 +65,22 @@ def render_name_at_mouse(
     console.print(*position, f"┤ {names_at_mouse_position} ├")
 
 
+def render_minimap(console: Console, engine: Engine, location: tuple[int, int]) -> None:
+    x, y = location
+    minimap = engine.game_map.minimap
+    width, height = minimap.cells.shape
+    console.draw_frame(x, y, *MINIMAP_FRAME)
+    console.print_box(x, y, MINIMAP_FRAME[0], 1, "┤ Map ├", alignment=tcod.CENTER)
+    # Centered in the frame, as small maps take less than `MINIMAP_SIZE`
+    minimap.render(
+        console,
+        (
+            x + 1 + (MINIMAP_SIZE[0] - width) // 2,
+            y + 1 + (MINIMAP_SIZE[1] - height) // 2,
+        ),
+    )
+
+
 def render_status(console: Console, engine: Engine) -> None:
     player = engine.player
     fighter = player.fighter
@@ -105,7 +129,9 @@ def render_status(console: Console, engine: Engine) -> None:
         luck_string += f" ({signal}{fighter.luck_bonus})"
     console.print(x + 1, y + 8, luck_string)
 
-    y, h = 12, 28
+    render_minimap(console, engine, (x, 30))
+
+    y, h = 12, 18
     console.draw_frame(x, y, w, h)
     console.print_box(x, y, w, 1, "┤ Equipment ├", alignment=tcod.CENTER)
     y += 2
@@ -132,3 +158,15 @@ def render_status(console: Console, engine: Engine) -> None:
 
     if y == 14:
         console.print_box(x, y, w, 1, "(Nothing Equipped)", alignment=tcod.CENTER)
+
+
+def render_latency_overlay(
+    console: Console, input_latency: InputLatency, location: tuple[int, int]
+) -> None:
+    """Print the live input latency percentiles of every handler type"""
+    x, y = location
+    console.print(x, y, "Input latency (ms)  p50   p95   p99", fg=color.menu_title)
+    for i, (name, values) in enumerate(input_latency.percentiles().items(), 1):
+        p50, p95, p99 = (value * 1000 for value in values)
+        line = f"{name[:18]:<18} {p50:5.1f} {p95:5.1f} {p99:5.1f}"
+        console.print(x, y + i, line, fg=color.white)
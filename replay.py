@@ -0,0 +1,199 @@
+"""
+Recorded games, played back as fast as possible
+
+While `recorder.enabled`, every action the player successfully takes and
+every level up choice is recorded, along with the seed the game was built
+from. Playing a recording back rebuilds the game from that seed and feeds it
+the same actions without rendering anything, so a session from the field can
+be profiled offline under exactly the same workload. State checksums stored
+every few actions make sure the playback did not drift from the original.
+"""
+
+from __future__ import annotations
+from time import perf_counter
+from typing import TYPE_CHECKING
+import argparse
+import json
+import random
+from action import Action, ActionWithDirection, ItemAction
+from exception import ReplayDesync, ReplayVersionError
+from state_hash import mix
+from instrumentation import metrics
+from tracing import tracer
+
+if TYPE_CHECKING:
+    from engine import Engine
+
+# Bump when recordings or their checksums change, older ones are refused
+REPLAY_VERSION = 2
+# A checksum of the game state is stored after this many actions
+CHECKSUM_INTERVAL = 10
+
+
+def state_checksum(engine: Engine) -> int:
+    """Return a checksum of the current floor and of its map state"""
+    return engine.game_map.state_hash.value ^ mix(engine.game_world.current_floor)
+
+
+def action_types() -> dict[str, type[Action]]:
+    """Return every known action class by name"""
+    types = {}
+    pending = [Action]
+    while pending:
+        cls = pending.pop()
+        types[cls.__name__] = cls
+        pending.extend(cls.__subclasses__())
+    return types
+
+
+def encode_action(action: Action) -> dict:
+    """Describe `action` by its class and arguments, items by inventory index"""
+    record: dict = {"action": type(action).__name__}
+    if isinstance(action, ActionWithDirection):
+        record["dx"], record["dy"] = action.dx, action.dy
+    item = getattr(action, "item", None)
+    if item is not None:
+        record["item"] = action.entity.inventory.items.index(item)
+    if isinstance(action, ItemAction):
+        record["target"] = list(action.target_position)
+    return record
+
+
+def decode_action(record: dict, engine: Engine) -> Action:
+    """Rebuild a recorded player action against `engine`"""
+    cls = action_types()[record["action"]]
+    player = engine.player
+    if "dx" in record:
+        return cls(player, record["dx"], record["dy"])
+    if "item" in record:
+        item = player.inventory.items[record["item"]]
+        if "target" in record:
+            return cls(player, item, tuple(record["target"]))
+        return cls(player, item)
+    return cls(player)
+
+
+class Recorder:
+    """Stream of the player decisions of a game, with periodic checksums"""
+
+    def __init__(self, checksum_interval: int = CHECKSUM_INTERVAL) -> None:
+        self.enabled = False
+        self.checksum_interval = checksum_interval
+        self.seed: int | None = None
+        self.events: list[dict] = []
+        self.actions = 0
+
+    def start(self, seed: int | None = None) -> int:
+        """Begin recording a new game and return the seed to build it from"""
+        if seed is None:
+            seed = random.SystemRandom().randrange(2**32)
+        self.seed = seed
+        self.events = []
+        self.actions = 0
+        return seed
+
+    def record_action(self, record: dict, engine: Engine) -> None:
+        """Store an action encoded before it was performed, once it succeeded"""
+        self.events.append(record)
+        self.actions += 1
+        if self.actions % self.checksum_interval == 0:
+            self.events.append({"checksum": state_checksum(engine)})
+
+    def record_level_up(self, attribute: str) -> None:
+        """Store a level up choice, by the name of the `Level` method called"""
+        self.events.append({"level_up": attribute})
+
+    def as_dict(self) -> dict:
+        return {"version": REPLAY_VERSION, "seed": self.seed, "events": self.events}
+
+    def save(self, filename: str) -> None:
+        """Write the recording as JSON, if a game was recorded at all"""
+        if self.seed is None:
+            return
+        with open(filename, "w") as file:
+            json.dump(self.as_dict(), file)
+
+
+recorder = Recorder()
+
+
+class PlaybackResult:
+    """Summary of a played back recording"""
+
+    def __init__(
+        self, engine: Engine, actions: int, checksums: int, elapsed: float
+    ) -> None:
+        self.engine = engine
+        self.actions = actions
+        self.checksums = checksums
+        self.elapsed = elapsed
+
+    @property
+    def actions_per_second(self) -> float:
+        return self.actions / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def play_back(replay: dict, verify: bool = True) -> PlaybackResult:
+    """
+    Rebuild the recorded game and feed it every recorded event, without rendering
+    Raise `ReplayVersionError` for a recording of another format version,
+    and `ReplayDesync` when an action is refused or, with `verify`,
+    when a stored checksum does not match the game state
+    """
+    from input_handling import MainGameEventHandler
+    from project import new_game
+
+    if replay.get("version") != REPLAY_VERSION:
+        raise ReplayVersionError(
+            f"Unsupported replay version {replay.get('version')},"
+            f" expected {REPLAY_VERSION}"
+        )
+
+    engine = new_game(replay["seed"])
+    handler = MainGameEventHandler(engine)
+    actions = checksums = 0
+    start = perf_counter()
+    for event in replay["events"]:
+        if "action" in event:
+            actions += 1
+            if not handler.handle_action(decode_action(event, engine)):
+                raise ReplayDesync(f"Action {actions} was refused: {event}")
+        elif "level_up" in event:
+            getattr(engine.player.level, event["level_up"])()
+        elif "checksum" in event and verify:
+            checksums += 1
+            if state_checksum(engine) != event["checksum"]:
+                raise ReplayDesync(f"State differs after action {actions}")
+
+    return PlaybackResult(engine, actions, checksums, perf_counter() - start)
+
+
+def load_replay(filename: str) -> dict:
+    with open(filename) as file:
+        return json.load(file)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Play a recorded game back.")
+    parser.add_argument("replay", help="file recorded with ROGUELIKEY_REPLAY")
+    parser.add_argument("--no-verify", action="store_true", help="skip checksums")
+    parser.add_argument("--metrics", help="write per-phase timings to this file")
+    parser.add_argument("--trace", help="write a Chrome trace to this file")
+    args = parser.parse_args()
+
+    metrics.enabled = bool(args.metrics)
+    tracer.enabled = bool(args.trace)
+    result = play_back(load_replay(args.replay), not args.no_verify)
+    if args.metrics:
+        metrics.dump(args.metrics)
+    if args.trace:
+        tracer.export(args.trace)
+
+    print(f"actions: {result.actions} ({result.checksums} checksums verified)")
+    print(f"floor: {result.engine.game_world.current_floor}")
+    print(f"elapsed: {result.elapsed:.3f}s")
+    print(f"actions per second: {result.actions_per_second:.1f}")
+
+
+if __name__ == "__main__":
+    main()
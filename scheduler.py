@@ -0,0 +1,79 @@
+"""
+Energy based turn scheduling
+
+Every living actor of a map sits on a persistent timeline, ordered by the
+time of its next turn. Acting costs energy, an action of `ACTION_COST` takes
+an actor of `BASE_SPEED` exactly one turn, faster actors act more often.
+Ties are broken by scheduling order, so the turn order is deterministic.
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+import heapq
+
+if TYPE_CHECKING:
+    from entity import Actor
+
+ACTION_COST = 100
+BASE_SPEED = 100
+
+
+def action_delay(cost: int, speed: int) -> int:
+    """Time until the next turn of an actor with `speed` after an action of `cost`"""
+    return max(1, cost * BASE_SPEED // speed)
+
+
+class TurnScheduler:
+    """Priority queue of actors keyed by the time of their next turn"""
+
+    def __init__(self) -> None:
+        self.time = 0
+        self.counter = 0
+        self.queue: list[list] = []
+        # Entries are [time, order, actor], a removed entry has actor None
+        self.entries: dict[Actor, list] = {}
+
+    def __contains__(self, actor: Actor) -> bool:
+        return actor in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, actor: Actor, delay: int = 0) -> None:
+        """Schedule `actor` to act `delay` time after the current time"""
+        self.remove(actor)
+        entry = [self.time + delay, self.counter, actor]
+        self.counter += 1
+        self.entries[actor] = entry
+        heapq.heappush(self.queue, entry)
+
+    def remove(self, actor: Actor) -> None:
+        """Take `actor` off the timeline, e.g. when it dies or leaves the map"""
+        entry = self.entries.pop(actor, None)
+        if entry is not None:
+            entry[2] = None
+
+    def reschedule(self, actor: Actor, cost: int) -> None:
+        """Move `actor` after an action of `cost`, counted from its own turn"""
+        entry = self.entries.get(actor)
+        start = entry[0] if entry is not None else self.time
+        self.remove(actor)
+        entry = [start + action_delay(cost, actor.speed), self.counter, actor]
+        self.counter += 1
+        self.entries[actor] = entry
+        heapq.heappush(self.queue, entry)
+
+    def peek(self) -> Actor | None:
+        """Return the actor with the earliest turn without removing it"""
+        while self.queue and self.queue[0][2] is None:
+            heapq.heappop(self.queue)
+        return self.queue[0][2] if self.queue else None
+
+    def pop(self) -> Actor | None:
+        """Remove and return the next actor, advancing the current time"""
+        actor = self.peek()
+        if actor is not None:
+            entry = heapq.heappop(self.queue)
+            del self.entries[actor]
+            self.time = entry[0]
+        return actor
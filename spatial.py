@@ -0,0 +1,115 @@
+"""
+Positions of the living actors of a map, kept in a NumPy array
+
+Rows are updated in place when an actor moves, and a removed actor is
+swapped with the last row, so the array never has to be rebuilt. Range and
+mask queries are then a few vectorized operations instead of a Python loop
+over every entity.
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+import numpy as np
+
+if TYPE_CHECKING:
+    from entity import Actor
+
+
+class ActorPositions:
+    """Living actors of a map, with their positions as an (n, 2) array"""
+
+    def __init__(self, capacity: int = 16) -> None:
+        self.actors: list[Actor] = []
+        self.rows: dict[Actor, int] = {}
+        self.array = np.zeros((capacity, 2), dtype=np.intp)
+
+    def __len__(self) -> int:
+        return len(self.actors)
+
+    def __contains__(self, actor: Actor) -> bool:
+        return actor in self.rows
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self.array[: len(self.actors)]
+
+    def add(self, actor: Actor) -> None:
+        if actor in self.rows:
+            return self.update(actor)
+        row = len(self.actors)
+        if row == len(self.array):
+            self.array = np.resize(self.array, (row * 2, 2))
+        self.rows[actor] = row
+        self.actors.append(actor)
+        self.array[row] = actor.x, actor.y
+
+    def update(self, actor: Actor) -> None:
+        """Copy the position of `actor`, if it is indexed"""
+        row = self.rows.get(actor)
+        if row is not None:
+            self.array[row] = actor.x, actor.y
+
+    def remove(self, actor: Actor) -> None:
+        row = self.rows.pop(actor, None)
+        if row is None:
+            return
+        last = self.actors.pop()
+        if last is not actor:
+            self.actors[row] = last
+            self.rows[last] = row
+            self.array[row] = self.array[len(self.actors)]
+
+    def select(self, selected: np.ndarray) -> list[Actor]:
+        """Return the actors of the rows where `selected` is set"""
+        return [self.actors[row] for row in np.flatnonzero(selected).tolist()]
+
+    def distances(self, position: tuple[int, int]) -> np.ndarray:
+        """Return the euclidean distance of every actor to `position`"""
+        offsets = self.positions - position
+        return np.hypot(offsets[:, 0], offsets[:, 1])
+
+    def within(self, position: tuple[int, int], radius: float) -> list[Actor]:
+        return self.select(self.distances(position) <= radius)
+
+    def at(self, position: tuple[int, int]) -> list[Actor]:
+        positions = self.positions
+        return self.select(
+            (positions[:, 0] == position[0]) & (positions[:, 1] == position[1])
+        )
+
+    def in_area(self, start: tuple[int, int], end: tuple[int, int]) -> list[Actor]:
+        """Return the actors inside the rectangle from `start` up to `end` excluded"""
+        positions = self.positions
+        return self.select(
+            (positions[:, 0] >= start[0])
+            & (positions[:, 1] >= start[1])
+            & (positions[:, 0] < end[0])
+            & (positions[:, 1] < end[1])
+        )
+
+    def in_mask(self, mask: np.ndarray) -> list[Actor]:
+        """Return the actors standing where the boolean map `mask` is set"""
+        positions = self.positions
+        return self.select(mask[positions[:, 0], positions[:, 1]])
+
+    def nearest(
+        self,
+        position: tuple[int, int],
+        radius: float,
+        mask: np.ndarray | None = None,
+        exclude: Actor | None = None,
+    ) -> Actor | None:
+        """
+        Return the closest actor within `radius` of `position`, if any
+        Only actors standing where `mask` is set are considered, when given
+        """
+        if not self.actors:
+            return None
+        distances = self.distances(position)
+        if mask is not None:
+            positions = self.positions
+            distances[~mask[positions[:, 0], positions[:, 1]]] = np.inf
+        if exclude in self.rows:
+            distances[self.rows[exclude]] = np.inf
+        row = int(np.argmin(distances))
+        return self.actors[row] if distances[row] <= radius else None
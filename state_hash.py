@@ -0,0 +1,159 @@
+"""
+Incremental hash of the state of a game map
+
+Every entity contributes a key mixed from its name, position and hit points.
+Every decal contributes one mixed from its label and position. The keys are
+summed, so moving or hurting an entity only swaps its own key.
+
+`tiles` and `explored` are hashed per chunk. Only the chunks touched by a
+change are hashed again. Comparing two maps then means comparing two
+integers, which is cheap enough to do every turn.
+
+The hash is computed in full the first time it is read, so a map can be
+generated freely beforehand. Writing to `tiles` afterwards must be followed
+by a call to `invalidate`.
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from zlib import crc32
+import numpy as np
+
+if TYPE_CHECKING:
+    from entity import Entity
+    from game_map import GameMap
+
+CHUNK_SIZE = 16
+# Side of the blocks read at once when hashing everything, a multiple of
+# CHUNK_SIZE matching the storage chunks of large maps
+READ_SIZE = 64
+MASK = 2**64 - 1
+
+_name_keys: dict[str, int] = {}
+
+
+def mix(value: int) -> int:
+    """Scramble a 64 bits integer (splitmix64 finalizer)"""
+    value = (value + 0x9E3779B97F4A7C15) & MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK
+    return value ^ (value >> 31)
+
+
+def state_key(name: str, position: tuple[int, int], value: int) -> int:
+    """Return the key of a named thing at `position`, in state `value`"""
+    name_key = _name_keys.get(name)
+    if name_key is None:
+        name_key = _name_keys[name] = mix(crc32(name.encode()))
+    return mix(mix(mix(name_key ^ position[0]) ^ position[1]) ^ (value & MASK))
+
+
+def entity_key(entity: Entity) -> int:
+    """Return the key of an entity, from its name, position and hit points"""
+    fighter = getattr(entity, "fighter", None)
+    hp = fighter.hp if fighter is not None else -1
+    return state_key(entity.name, entity.position, hp)
+
+
+def decal_key(position: tuple[int, int], label: str) -> int:
+    return state_key(label, position, -2)
+
+
+class StateHash:
+    """Hash of a `GameMap`, kept up to date as the map changes"""
+
+    def __init__(self, game_map: GameMap) -> None:
+        self.game_map = game_map
+        self.dirty = True
+        self.entity_keys: dict[Entity, int] = {}
+        self.entity_sum = 0
+        # (layer, chunk x, chunk y) -> key of that chunk
+        self.chunk_keys: dict[tuple[int, int, int], int] = {}
+        self.chunk_xor = 0
+
+    @property
+    def value(self) -> int:
+        if self.dirty:
+            self.recompute()
+        return self.entity_sum ^ self.chunk_xor
+
+    def invalidate(self) -> None:
+        """Hash everything again on the next read"""
+        self.dirty = True
+
+    def recompute(self) -> None:
+        """Hash the whole map from scratch"""
+        game_map = self.game_map
+        self.entity_keys = {entity: entity_key(entity) for entity in game_map.entities}
+        self.entity_sum = sum(self.entity_keys.values()) & MASK
+        for position, label in game_map.decals:
+            self.entity_sum = (self.entity_sum + decal_key(position, label)) & MASK
+        self.chunk_keys = {}
+        self.chunk_xor = 0
+        for layer, array in enumerate((game_map.tiles, game_map.explored)):
+            for x in range(0, game_map.width, READ_SIZE):
+                for y in range(0, game_map.height, READ_SIZE):
+                    block = array[x : x + READ_SIZE, y : y + READ_SIZE]
+                    for bx in range(0, block.shape[0], CHUNK_SIZE):
+                        for by in range(0, block.shape[1], CHUNK_SIZE):
+                            self.hash_chunk(
+                                layer,
+                                (x + bx) // CHUNK_SIZE,
+                                (y + by) // CHUNK_SIZE,
+                                block[bx : bx + CHUNK_SIZE, by : by + CHUNK_SIZE],
+                            )
+        self.dirty = False
+
+    def hash_chunk(
+        self, layer: int, cx: int, cy: int, data: np.ndarray | None = None
+    ) -> None:
+        """
+        Replace the key of a chunk of `tiles` (layer 0) or `explored` (layer 1)
+        The chunk is read from the map unless its content is given as `data`
+        """
+        if data is None:
+            array = self.game_map.explored if layer else self.game_map.tiles
+            x, y = cx * CHUNK_SIZE, cy * CHUNK_SIZE
+            data = array[x : x + CHUNK_SIZE, y : y + CHUNK_SIZE]
+        data = np.ascontiguousarray(data)
+        key = mix(crc32(data.tobytes()) ^ mix(layer << 48 | cx << 24 | cy))
+        chunk = layer, cx, cy
+        self.chunk_xor ^= self.chunk_keys.get(chunk, 0) ^ key
+        self.chunk_keys[chunk] = key
+
+    def update(self, entity: Entity) -> None:
+        """Account for an entity entering this map or changing"""
+        if self.dirty:
+            return
+        key = entity_key(entity)
+        old = self.entity_keys.get(entity, 0)
+        self.entity_keys[entity] = key
+        self.entity_sum = (self.entity_sum - old + key) & MASK
+
+    def remove(self, entity: Entity) -> None:
+        """Account for an entity leaving this map"""
+        if self.dirty:
+            return
+        old = self.entity_keys.pop(entity, 0)
+        self.entity_sum = (self.entity_sum - old) & MASK
+
+    def add_decal(self, position: tuple[int, int], label: str) -> None:
+        if not self.dirty:
+            self.entity_sum = (self.entity_sum + decal_key(position, label)) & MASK
+
+    def update_explored(
+        self, changed: np.ndarray, offset: tuple[int, int] = (0, 0)
+    ) -> None:
+        """
+        Hash again the chunks of `explored` where `changed` is set
+        `changed` covers the part of the map starting at `offset`
+        """
+        if self.dirty:
+            return
+        xs, ys = np.nonzero(changed)
+        if not len(xs):
+            return
+        xs, ys = xs + offset[0], ys + offset[1]
+        chunks = np.unique((xs // CHUNK_SIZE).astype(np.int64) << 32 | ys // CHUNK_SIZE)
+        for chunk in chunks.tolist():
+            self.hash_chunk(1, chunk >> 32, chunk & 0xFFFFFFFF)
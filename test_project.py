@@ -7,10 +7,549 @@ def test_new_game():
     assert isinstance(new_game(), Engine)
 
 
-def test_save_game():
+def test_save_game(tmp_path):
     handler = MainGameEventHandler(new_game())
-    save_game(handler, save_file_name)
+    save_game(handler, str(tmp_path / save_file_name))
 
 
-def test_load_game():
-    assert isinstance(load_game(save_file_name), Engine)
+def test_load_game(tmp_path):
+    filename = str(tmp_path / save_file_name)
+    save_game(MainGameEventHandler(new_game()), filename)
+    assert isinstance(load_game(filename), Engine)
+
+
+def test_headless_game():
+    from headless import RandomWalker, run_game
+
+    result = run_game(RandomWalker, max_turns=50, seed=1)
+    assert 0 < result.turns <= 50
+    assert result.as_dict()["floor"] >= 1
+
+
+def test_benchmark_suite():
+    from benchmarks.suite import run_suite
+
+    record = next(run_suite(["update_fov"], repeat=2, min_time=0.001))
+    assert record["key"] == "update_fov[map_size=64x64]"
+    assert len(record["samples"]) == 2 and record["median"] > 0
+
+
+def test_scaling_scenarios():
+    from benchmarks.scenarios import SUBSYSTEMS, run_scenarios
+
+    report = run_scenarios([32], [10, 100], turns=1)
+    assert [point["enemies"] for point in report["points"]] == [10, 100]
+    assert set(report["curves"]) == set(SUBSYSTEMS)
+
+
+def test_benchmark_comparison():
+    from benchmarks.compare import Comparison
+
+    baseline = {"median": 1.0, "iqr": 0.01}
+    assert Comparison("a", baseline, {"median": 1.05, "iqr": 0.01}).status() == "ok"
+    assert Comparison("b", baseline, {"median": 1.5, "iqr": 0.01}).status() == "REGRESSED"
+    assert Comparison("c", baseline, {"median": 1.5, "iqr": 0.5}).status() == "ok"
+    assert Comparison("d", None, baseline).status() == "new"
+
+
+def test_turn_metrics():
+    from headless import RandomWalker, run_game
+    from instrumentation import metrics
+
+    metrics.enabled = True
+    try:
+        run_game(RandomWalker, max_turns=20, seed=1)
+    finally:
+        metrics.enabled = False
+    summary = metrics.summary()
+    metrics.reset()
+    assert summary["enemy_turn"]["count"] == summary["update_fov"]["count"] > 0
+    assert "action.perform" in summary
+
+
+def test_input_latency():
+    from instrumentation import InputLatency, Metrics
+    from render_functions import render_latency_overlay
+    from tcod.console import Console
+
+    latency = InputLatency(Metrics())
+    latency.enabled = True
+    latency.dispatched(MainGameEventHandler(new_game()))
+    latency.presented()
+    (p50, p95, p99) = latency.percentiles()["MainGameEventHandler"]
+    assert 0 < p50 <= p95 <= p99
+    render_latency_overlay(Console(96, 64, order="F"), latency, (2, 2))
+
+
+def test_trace_export(tmp_path):
+    from tcod.console import Console
+    from tracing import tracer
+
+    tracer.enabled = True
+    try:
+        engine = new_game()
+        MainGameEventHandler(engine).on_render(Console(96, 64, order="F"))
+        engine.save_as(str(tmp_path / "trace.sav"))
+    finally:
+        tracer.enabled = False
+    names = {event["name"] for event in tracer.trace_events()}
+    tracer.clear()
+    assert {"floor generation", "map render", "log render", "save"} <= names
+
+
+def test_memory_report():
+    from input_handling import MemoryReportDialog
+    from memory import memory_report
+    from tcod.console import Console
+
+    engine = new_game()
+    report = memory_report(engine).as_dict()
+    assert report["GameMap.tiles"]["bytes"] >= engine.game_map.tiles.nbytes
+    assert report["Actor: Player"]["count"] == 1
+    assert report["MessageLog.messages"]["count"] == 1
+
+    console = Console(96, 64, order="F")
+    MemoryReportDialog(MainGameEventHandler(engine)).on_render(console)
+    assert "# Memory Report" in str(console)
+
+
+def test_turn_scheduler():
+    from scheduler import TurnScheduler, action_delay
+
+    class Dummy:
+        def __init__(self, name: str, speed: int) -> None:
+            self.name = name
+            self.speed = speed
+
+    slow, fast, dead = Dummy("slow", 100), Dummy("fast", 200), Dummy("dead", 100)
+    scheduler = TurnScheduler()
+    for actor in (slow, fast, dead):
+        scheduler.add(actor)
+    scheduler.remove(dead)
+
+    order = []
+    for _ in range(6):
+        actor = scheduler.pop()
+        order.append(actor.name)
+        scheduler.add(actor, action_delay(100, actor.speed))
+    assert order == ["slow", "fast", "fast", "slow", "fast", "fast"]
+
+
+def test_enemy_action_costs(monkeypatch):
+    from action import MeleeAction, MovementAction
+    import game_map as game_map_module
+    import entity_factory
+    import tile_types
+
+    monkeypatch.setattr(MeleeAction, "cost", 300)
+    monkeypatch.setattr(MovementAction, "cost", 50)
+    engine = new_game(seed=1)
+    game_map = engine.game_map = game_map_module.GameMap(engine, (32, 16), [])
+    game_map.tiles[2:30, 5] = tile_types.floor
+    player = engine.player
+    player.place((5, 5), game_map)
+    player.fighter.hp = player.fighter.max_hp = 10**6
+    attacker = entity_factory.orc.spawn(game_map, (6, 5))
+    mover = entity_factory.orc.spawn(game_map, (12, 5))
+    engine.update_fov()
+
+    engine.handle_enemy_turn()
+    entries = game_map.scheduler.entries
+    assert entries[attacker][0] == 300
+    assert mover.position == (10, 5) and entries[mover][0] == 100
+
+
+def test_dormant_actors():
+    from activation import COARSE_RADIUS
+    from benchmarks.scenarios import build_arena
+
+    engine = build_arena(128, 200)
+    game_map = engine.game_map
+    engine.handle_enemy_turn()
+    activation = game_map.activation
+    assert 0 < len(activation.sleeping) < 200
+    assert len(game_map.scheduler) + len(activation.sleeping) == 201
+
+    far = next(iter(activation.sleeping))
+    activation.make_noise(engine.player.position, 1000)
+    assert far not in activation and far in game_map.scheduler
+    assert far.ai.path
+    engine.handle_enemy_turn()
+    assert far not in activation
+    assert activation.wake_near(engine.player.position, COARSE_RADIUS) == []
+
+
+def test_batch_games():
+    from batch import run_batch, summarize
+
+    records = sorted(
+        run_batch(range(3), max_turns=30, processes=2), key=lambda r: r["seed"]
+    )
+    assert [record["seed"] for record in records] == [0, 1, 2]
+    summary = summarize(records)
+    assert summary["games"] == 3 and summary["floor_mean"] >= 1
+
+
+def test_replay():
+    from action import ItemAction
+    from headless import run_game
+    import pytest
+    from exception import ReplayVersionError
+    from replay import REPLAY_VERSION, decode_action, encode_action, play_back
+    from replay import recorder, state_checksum
+
+    recorder.enabled = True
+    try:
+        engine = run_game(max_turns=60, seed=3).engine
+    finally:
+        recorder.enabled = False
+    result = play_back(recorder.as_dict())
+    assert result.actions == recorder.actions > 0
+    assert state_checksum(result.engine) == state_checksum(engine)
+
+    player = engine.player
+    action = ItemAction(player, player.inventory.items[-1], (3, 4))
+    decoded = decode_action(encode_action(action), engine)
+    assert (decoded.item, decoded.target_position) == (action.item, (3, 4))
+
+    old = dict(recorder.as_dict(), version=REPLAY_VERSION - 1)
+    with pytest.raises(ReplayVersionError):
+        play_back(old)
+
+
+def test_state_hash():
+    from headless import run_game
+    from state_hash import StateHash
+
+    engine = run_game(max_turns=40, seed=5).engine
+    state_hash = engine.game_map.state_hash
+    before = state_hash.value
+    fresh = StateHash(engine.game_map)
+    assert fresh.value == before
+
+    engine.player.move(1, 0)
+    assert state_hash.value != before
+    engine.player.move(-1, 0)
+    assert state_hash.value == before
+
+
+def test_actor_queries():
+    import numpy as np
+    from benchmarks.suite import build_engine, spawn_enemies
+    from components.ai import DIRECTIONS
+    import entity_factory
+
+    engine = build_engine((64, 64), seed=1)
+    game_map = engine.game_map
+    player = engine.player
+    enemy, *enemies = spawn_enemies(engine, 20)
+    mask = np.zeros((64, 64), dtype=bool)
+    mask[enemy.position] = True
+    assert game_map.actors_in_mask(mask) == [enemy]
+    enemy.fighter.hp = 0
+    assert game_map.actors_in_mask(mask) == []
+
+    for enemy in enemies:
+        near = enemy.distance_between(*player.position) <= 6
+        assert (enemy in game_map.actors_within(player.position, 6)) == near
+
+    x, y = player.position
+    beside = next(
+        (x + dx, y + dy)
+        for dx, dy in DIRECTIONS
+        if game_map.tiles["walkable"][x + dx, y + dy]
+        and not game_map.get_blocking_entity_at((x + dx, y + dy))
+    )
+    enemy = entity_factory.orc.spawn(game_map, beside)
+    nearest = game_map.nearest_visible_actor(player.position, 100, exclude=player)
+    assert nearest is enemy and game_map.visible[nearest.position]
+
+
+def test_lightning_range():
+    import pytest
+    from action import ItemAction, PickupAction
+    from exception import Impossible
+    import game_map as game_map_module
+    import entity_factory
+    import tile_types
+
+    engine = new_game(seed=1)
+    game_map = engine.game_map = game_map_module.GameMap(engine, (32, 16), [])
+    game_map.tiles[2:30, 2:14] = tile_types.floor
+    player = engine.player
+    player.place((5, 5), game_map)
+    scroll = entity_factory.lightning_scroll.spawn(game_map, player.position)
+    PickupAction(player).perform()
+    # The scroll reaches anything less than one tile past its range
+    reach = scroll.consumable.maximum_range + 1
+    orc = entity_factory.orc.spawn(game_map, (5 + reach, 5))
+    engine.update_fov()
+    with pytest.raises(Impossible):
+        ItemAction(player, scroll).perform()
+    orc.move(-1, 1)
+    assert reach - 1 < orc.distance_between(*player.position) < reach
+    ItemAction(player, scroll).perform()
+    assert orc.fighter.hp < orc.fighter.max_hp or not orc.is_alive
+
+
+def test_entity_collections():
+    from action import DropAction, PickupAction
+    from benchmarks.suite import build_engine, spawn_enemies
+    import entity_factory
+
+    engine = build_engine((64, 64), seed=2)
+    game_map = engine.game_map
+    player = engine.player
+    enemy = spawn_enemies(engine, 1)[0]
+    assert enemy in game_map.actors and enemy not in game_map.corpses
+    enemy.fighter.hp = 0
+    assert enemy not in game_map.actors and enemy not in game_map.entities
+    assert game_map.decals.labels_at(enemy.position) == ["remains of Orc"]
+
+    item = entity_factory.health_potion.spawn(game_map, player.position)
+    assert item in game_map.items
+    PickupAction(player).perform()
+    assert item not in game_map.items and item in player.inventory.items
+    DropAction(player, item).perform()
+    assert item in game_map.items
+
+    entity_factory.health_potion.spawn(game_map, player.position)
+    for entity in game_map.items + game_map.actors:
+        if entity is not player:
+            game_map.remove_entity(entity)
+    assert not game_map.items and game_map.actors == (player,)
+
+
+def test_travel():
+    from input_handling import MainGameEventHandler
+    from project import new_game
+    from travel import TravelMaps, travel
+
+    engine = new_game(seed=4)
+    game_map = engine.game_map
+    for actor in list(game_map.actors):
+        if actor is not engine.player:
+            game_map.remove_entity(actor)
+    handler = MainGameEventHandler(engine)
+
+    while travel(handler, TravelMaps.explore, "Nothing left to explore."):
+        pass
+    assert game_map.explored[game_map.down_stairs_location]
+    explored_count = int(game_map.explored.sum())
+    assert game_map.travel_maps.explored_count == explored_count
+    assert travel(handler, TravelMaps.stairs, "No way to the stairs.") > 0
+    assert engine.player.position == game_map.down_stairs_location
+
+
+def test_coalesce_events():
+    from project import coalesce_events, max_key_repeats
+    import tcod.event
+
+    def key(repeat: bool) -> tcod.event.KeyDown:
+        return tcod.event.KeyDown(
+            scancode=tcod.event.Scancode.L, sym=tcod.event.K_l, mod=0, repeat=repeat
+        )
+
+    first_motion, last_motion = tcod.event.MouseMotion(), tcod.event.MouseMotion()
+    events = [first_motion, key(False)] + [key(True) for _ in range(10)]
+    coalesced = coalesce_events(events + [last_motion])
+    assert len(coalesced) == 1 + max_key_repeats + 1
+    assert coalesced[-1] is last_motion
+    assert all(event is not first_motion for event in coalesced)
+
+    press = key(False)
+    coalesced = coalesce_events([first_motion, last_motion, press])
+    assert len(coalesced) == 2
+    assert coalesced[0] is last_motion and coalesced[1] is press
+
+
+def test_camera_viewport():
+    from benchmarks.suite import build_engine
+    from tcod.console import Console
+
+    engine = build_engine((300, 200), seed=1)
+    player, camera = engine.player, engine.camera
+    player.place((150, 190))
+    engine.update_fov()
+    console = Console(96, 64, order="F")
+    engine.render_map(console)
+    assert (camera.x, camera.y) == (150 - camera.width // 2, 200 - camera.height)
+
+    screen = camera.map_to_screen(player.position)
+    assert camera.screen_to_map(screen) == player.position
+    assert chr(console.tiles_rgb["ch"][screen]) == player.char
+    assert camera.screen_to_map((camera.width, 0)) is None
+
+
+def test_path_leaving_window(monkeypatch):
+    import game_map as game_map_module
+    import entity_factory
+    import tile_types
+
+    monkeypatch.setattr(game_map_module, "CHUNKED_MAP_AREA", 0)
+    engine = new_game(seed=1)
+    game_map = game_map_module.GameMap(engine, (64, 64), [])
+    # A U shaped corridor dipping far below the box around both ends
+    game_map.tiles[5:6, 5:41] = tile_types.floor
+    game_map.tiles[12:13, 5:41] = tile_types.floor
+    game_map.tiles[5:13, 40:41] = tile_types.floor
+    engine.player.place((12, 5), game_map)
+    orc = entity_factory.orc.spawn(game_map, (5, 5))
+    path = orc.ai.get_path_to(engine.player.position)
+    assert len(path) == 75 and path[-1] == (12, 5)
+
+
+def test_chunked_grid():
+    from chunked import ChunkedGrid
+    import numpy as np
+    import pytest
+
+    grid = ChunkedGrid((200, 100), bool, False, chunk_size=16, max_hot=2)
+    dense = np.zeros((200, 100), dtype=bool)
+    for array in grid, dense:
+        array[10:40, 5:30] = True
+        array[150, 90] = True
+        array[np.array([0, 199]), np.array([0, 99])] = True
+    assert (np.asarray(grid) == dense).all()
+    assert (grid[5:60, 0:35] == dense[5:60, 0:35]).all()
+    assert grid[150, 90] and not grid[151, 90]
+    assert len(grid.hot) <= 2 and grid.cold
+    assert grid.nbytes < dense.nbytes
+
+    grid[10:40, 5:30] = False
+    np.asarray(grid)
+    assert len(grid.hot) + len(grid.cold) == 3
+
+    dense[10:40, 5:30] = False
+    mask = np.zeros((200, 100), dtype=bool)
+    mask[::7, ::3] = True
+    for array in grid, dense:
+        array[mask] = True
+        array[-1, -2] = True
+    assert (grid[mask] == dense[mask]).all()
+    assert grid[-1, -2] and (grid[-3:, -1] == dense[-3:, -1]).all()
+    assert (grid[...] == dense).all() and (grid[:] == dense).all()
+    grid[...] = False
+    assert not np.asarray(grid).any()
+    grid[:] = True
+    assert np.asarray(grid).all()
+
+    with pytest.raises(IndexError):
+        grid[200, 0]
+    with pytest.raises(IndexError):
+        grid[0, -101] = True
+    with pytest.raises(IndexError):
+        grid[np.zeros((3, 3), dtype=bool)]
+    with pytest.raises(IndexError):
+        grid[1, 2, 3]
+    with pytest.raises(TypeError):
+        grid[1.5, 2]
+
+
+def test_minimap():
+    from minimap import FLOOR, Minimap
+
+    engine = new_game(seed=4)
+    game_map, player = engine.game_map, engine.player
+    minimap = game_map.minimap
+    minimap.refresh()
+    assert minimap.cells[minimap.to_cell(player.position)] == FLOOR
+    assert not minimap.dirty.any()
+
+    stale = minimap.cells.copy()
+    game_map.explored[:, :] = True
+    minimap.update_explored(game_map.explored[:10, :10], (20, 20))
+    corner = minimap.dirty.copy()
+    assert corner.sum() == len(range(20, 30, minimap.block)) ** 2
+    minimap.refresh()
+    full = Minimap(game_map)
+    full.refresh()
+    assert (minimap.cells[corner] == full.cells[corner]).all()
+    assert (minimap.cells[~corner] == stale[~corner]).all()
+
+
+def test_startup_imports():
+    from benchmarks.startup import import_times
+
+    imported = {name for name, _, _ in import_times("project")}
+    assert "input_handling" in imported
+    assert not {"entity_factory", "game_map", "generation", "travel"} & imported
+
+
+def test_content_registry(tmp_path):
+    from content import CONTENT_FILE, Registry, cache_path, load_tables
+    from exception import ContentError
+    import hashlib
+    import json
+    import os
+    import pytest
+
+    with open(CONTENT_FILE, encoding="utf-8") as file:
+        content = json.load(file)
+    path = tmp_path / "content.json"
+    path.write_text(json.dumps(content))
+    registry = Registry(str(path))
+    assert registry.load() is registry.tables
+    assert not registry.prototypes
+    orc = registry.prototype("orc")
+    assert (orc.name, orc.fighter.max_hp) == ("Orc", 10)
+    assert list(registry.prototypes) == ["orc"]
+    assert registry.spawn_chances("enemies")[0] == [(orc, 80)]
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    assert os.path.exists(cache_path(str(path), digest))
+
+    for section, kind, entries, key in [
+        ("spawns", "items", {"0": [["unknown_potion", 5]]}, "unknown_potion"),
+        ("spawns", "enemies", {"0": [["orc", "many"]]}, r"spawns\.enemies\.0\[0\]"),
+        ("spawns", "items", {"2": [["health_potion"]]}, r"spawns\.items\.2\[0\]"),
+        ("floor_caps", "items", [[1, 1], [4, "2"]], r"floor_caps\.items\[1\]"),
+    ]:
+        broken = dict(content, **{section: dict(content[section], **{kind: entries})})
+        path.write_text(json.dumps(broken))
+        with pytest.raises(ContentError, match=key):
+            load_tables(str(path))
+
+
+def test_message_records():
+    from message_log import MessageCounter, MessageLog
+
+    log = MessageLog()
+    for _ in range(2):
+        log.add("attack", attacker="Orc", target="Player", damage=2)
+    log.add("xp", xp=35)
+    attack, xp = log.messages
+    assert attack.count == 2 and attack._text is None
+    assert attack.full_text == "Orc attacks Player for 2 hit points. (x2)"
+    assert xp.as_dict()["category"] == "progress"
+
+    counter = MessageCounter()
+    counter.add("attack", attacker="Orc", target="Player", damage=2)
+    counter.add_message("Welcome")
+    assert not counter.messages
+    assert counter.by_category() == {"combat": 1, "info": 1}
+
+
+def test_event_bus():
+    from events import Damage, Death, FloorChange, events
+    from headless import run_game
+
+    damage, deaths, floors = [], [], []
+    subscriptions = [
+        (Damage, damage.append),
+        (Damage, lambda event: None),
+        (Death, deaths.append),
+        (FloorChange, floors.append),
+    ]
+    for kind, subscriber in subscriptions:
+        events.subscribe(kind, subscriber)
+    try:
+        result = run_game(max_turns=300, seed=2)
+    finally:
+        for kind, subscriber in subscriptions:
+            events.unsubscribe(kind, subscriber)
+    assert not events.handlers
+
+    assert floors[0] == FloorChange(1) and floors[-1].floor == result.floor
+    assert all(event.amount >= 0 for event in damage)
+    assert any(event.target is result.engine.player for event in damage)
+    assert len(deaths) == len({id(event.actor) for event in deaths})
@@ -0,0 +1,67 @@
+"""
+Timeline tracing of the game loop
+
+When enabled, spans are recorded for every instrumented block and can be
+exported in the Chrome trace-event format, to be opened with
+`chrome://tracing` or https://ui.perfetto.dev
+"""
+
+from __future__ import annotations
+from collections import deque
+from time import perf_counter
+from typing import ContextManager
+from instrumentation import NULL_CONTEXT, BlockTimer
+import json
+import os
+
+# Oldest spans are dropped once this many are held
+MAX_SPANS = 1_000_000
+
+
+class Tracer:
+    """Collects complete spans, to be exported as a Chrome trace"""
+
+    def __init__(self, max_spans: int = MAX_SPANS) -> None:
+        self.enabled = False
+        self.origin = perf_counter()
+        self.spans: deque[tuple[str, str, float, float]] = deque(maxlen=max_spans)
+
+    def span(self, name: str, category: str = "game") -> ContextManager[None]:
+        """Record the enclosed block as a span, when enabled"""
+        if not self.enabled:
+            return NULL_CONTEXT
+        return BlockTimer(lambda start, end: self.add(name, category, start, end))
+
+    def add(self, name: str, category: str, start: float, end: float) -> None:
+        """Record a span from `perf_counter` timestamps"""
+        self.spans.append((name, category, start, end))
+
+    def clear(self) -> None:
+        self.origin = perf_counter()
+        self.spans.clear()
+
+    def trace_events(self) -> list[dict]:
+        """Return the spans as Chrome trace complete (`X`) events"""
+        pid = os.getpid()
+        return [
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": pid,
+                "tid": 0,
+            }
+            for name, category, start, end in self.spans
+        ]
+
+    def export(self, filename: str) -> None:
+        """Write the recorded spans as a Chrome trace JSON file"""
+        with open(filename, "w") as file:
+            json.dump(
+                {"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, file
+            )
+
+
+tracer = Tracer()
@@ -0,0 +1,140 @@
+"""
+Auto-explore and travel, many turns for a single keypress
+
+Both commands walk downhill on a Dijkstra distance map over the explored
+walkable tiles. A map is only computed again once more of the floor has been
+explored, so a long walk mostly costs one lookup per step. Every step is a
+regular action, handled like a keypress would be, but no frame is drawn until
+the walk stops.
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING, Callable
+from action import MovementAction
+from components.ai import DIRECTIONS
+import numpy as np
+import tcod
+
+if TYPE_CHECKING:
+    from game_map import GameMap
+    from input_handling import EventHandler
+
+# Upper bound of turns spent by a single travel command
+MAX_TRAVEL_TURNS = 500
+
+
+class TravelMaps:
+    """Distance maps of a floor, cached until more of it is explored"""
+
+    def __init__(self, game_map: GameMap) -> None:
+        self.game_map = game_map
+        # Tiles explored so far, counted by the field of view as it goes
+        self.explored_count = 0
+        # kind -> (explored tiles count, distance map)
+        self.cache: dict[str, tuple[int, np.ndarray]] = {}
+
+    def update_explored(self, changed: np.ndarray) -> None:
+        """Count the tiles set in `changed` as newly explored"""
+        self.explored_count += int(np.count_nonzero(changed))
+
+    def distance_to(self, kind: str, goals: Callable[[], np.ndarray]) -> np.ndarray:
+        """Return the distance map to the `goals` mask, computing it if outdated"""
+        game_map = self.game_map
+        version = self.explored_count
+        cached = self.cache.get(kind)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        explored = np.asarray(game_map.explored)
+        walkable = np.asarray(game_map.tiles["walkable"])
+        cost = (walkable & explored).astype(np.int8)
+        distance = tcod.path.maxarray(cost.shape, order="F")
+        distance[goals() & (cost > 0)] = 0
+        tcod.path.dijkstra2d(distance, cost, 2, 3, out=distance)
+        self.cache[kind] = version, distance
+        return distance
+
+    def frontier(self) -> np.ndarray:
+        """Explored walkable tiles next to a tile which is not explored yet"""
+        explored = np.asarray(self.game_map.explored)
+        unexplored = np.pad(~explored, 1, constant_values=False)
+        width, height = explored.shape
+        near_unexplored = np.zeros_like(explored)
+        for dx, dy in DIRECTIONS:
+            near_unexplored |= unexplored[
+                1 + dx : 1 + dx + width, 1 + dy : 1 + dy + height
+            ]
+        return near_unexplored & explored & np.asarray(self.game_map.tiles["walkable"])
+
+    def explore(self) -> np.ndarray:
+        return self.distance_to("explore", self.frontier)
+
+    def stairs(self) -> np.ndarray:
+        def goals() -> np.ndarray:
+            goal = np.zeros(self.game_map.explored.shape, dtype=bool)
+            goal[self.game_map.down_stairs_location] = True
+            return goal
+
+        return self.distance_to("stairs", goals)
+
+    def next_step(self, distance: np.ndarray) -> tuple[int, int] | None:
+        """Return the direction going downhill from the player, if any"""
+        game_map = self.game_map
+        x, y = game_map.engine.player.position
+        best, step = distance[x, y], None
+        for dx, dy in DIRECTIONS:
+            if game_map.in_bounds(x + dx, y + dy) and distance[x + dx, y + dy] < best:
+                best, step = distance[x + dx, y + dy], (dx, dy)
+        return step
+
+
+def enemies_in_sight(game_map: GameMap) -> bool:
+    player = game_map.engine.player
+    return any(
+        actor is not player for actor in game_map.actors_in_mask(game_map.visible)
+    )
+
+
+def travel(
+    handler: EventHandler,
+    distance_map: Callable[[TravelMaps], np.ndarray],
+    nowhere: str,
+    max_turns: int = MAX_TRAVEL_TURNS,
+) -> int:
+    """
+    Walk the player downhill on `distance_map` and return the turns taken
+    The walk stops at the goal, when an enemy comes into view, when the player
+    gets hurt or levels up, or when the way is blocked
+    `nowhere` is the message given when there is no way to go at all
+    """
+    engine = handler.engine
+    player = engine.player
+    if enemies_in_sight(engine.game_map):
+        engine.message_log.add_message("Not with enemies in sight.")
+        return 0
+
+    hp = player.fighter.hp
+    turns = 0
+    while turns < max_turns:
+        game_map = engine.game_map
+        travel_maps = game_map.travel_maps
+        step = travel_maps.next_step(distance_map(travel_maps))
+        if step is None and not turns:
+            engine.message_log.add_message(nowhere)
+        if step is None or game_map.get_blocking_entity_at(
+            (player.x + step[0], player.y + step[1])
+        ):
+            break
+        if not handler.handle_action(MovementAction(player, *step)):
+            break
+        turns += 1
+        if (
+            not player.is_alive
+            or player.fighter.hp < hp
+            or player.level.requires_level_up
+        ):
+            break
+        if enemies_in_sight(game_map):
+            engine.message_log.add_message("An enemy comes into view.")
+            break
+    return turns